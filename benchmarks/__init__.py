@@ -0,0 +1,13 @@
+"""
+Runnable micro-benchmarks for the performance work in this repository.
+
+Each module is a script, run from the repository root:
+
+    python -m benchmarks.blocklist_cache
+
+They build the app with the testing configuration on a throwaway SQLite
+file, or on BENCH_DATABASE_URL when it is set (use a scratch database:
+tables are created in it and benchmark rows are left behind). Figures are
+wall-clock latencies in milliseconds from the Flask test client, so they
+exclude the network and the WSGI server.
+"""
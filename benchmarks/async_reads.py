@@ -0,0 +1,54 @@
+"""
+Read latency under concurrency with and without ASYNC_READS.
+
+Runs --concurrency client threads (like a gthread worker's request threads)
+against the journey detail endpoint, with the response cache off so every
+request reaches the database, and reports p50/p99 for the psycopg2 session
+and for the asyncpg engine. Needs BENCH_DATABASE_URL to point at a scratch
+Postgres database, since the async engine is asyncpg-only.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import create_user, login, make_app, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--steps', type=int, default=50, help='steps in the journey that is read')
+    args = parser.parse_args()
+
+    if not os.environ.get('BENCH_DATABASE_URL', '').startswith(('postgresql', 'postgres://')):
+        sys.exit('Set BENCH_DATABASE_URL to a scratch Postgres database to compare the async path.')
+
+    app = make_app(RESPONSE_CACHE_ENABLED=False)
+    create_user(app, username=f'bench-{os.getpid()}')
+    client = app.test_client()
+    headers = login(client, username=f'bench-{os.getpid()}')
+    journey_id = client.post('/api/journeys/', headers=headers, json={'title': 'Benchmark'}).get_json()['id']
+    client.post(f'/api/journeys/{journey_id}/steps:batch', headers=headers,
+                json={'steps': [{'title': f'Step {n}'} for n in range(args.steps)]})
+
+    def read(_):
+        start = time.perf_counter()
+        assert app.test_client().get(f'/api/journeys/{journey_id}', headers=headers).status_code == 200
+        return time.perf_counter() - start
+
+    for label, async_reads in (('psycopg2 session', False), ('asyncpg engine (ASYNC_READS)', True)):
+        app.config['ASYNC_READS'] = async_reads
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(read, range(args.concurrency * 10)))
+            started = time.perf_counter()
+            samples = list(executor.map(read, range(args.requests)))
+            elapsed = time.perf_counter() - started
+        report(f'{label} x{args.concurrency}', samples)
+        print(f'{"":<40} {args.requests / elapsed:.0f} requests/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Authenticated request latency with the JWT blocklist fast paths on and off.
+
+Seeds token_blocklist with revoked JTIs, then times a conditional GET of the
+journey listing (a 304, so little besides the blocklist check and the ETag
+stamp runs) with the Bloom filter and TTL cache enabled, the cache alone,
+and neither.
+"""
+import argparse
+import uuid
+from datetime import datetime, timedelta
+
+from .common import create_user, login, make_app, measure, report
+
+CONFIGURATIONS = (
+    ('bloom filter + cache', True, True),
+    ('cache only', False, True),
+    ('no cache (query per request)', False, False),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--revoked', type=int, default=10000, help='rows seeded into token_blocklist')
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    from server.models import TokenBlocklist, db
+
+    app = make_app()
+    create_user(app)
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.bulk_insert_mappings(TokenBlocklist, [
+            {'jti': str(uuid.uuid4()), 'created_at': now, 'expires_at': now + timedelta(days=1)}
+            for _ in range(args.revoked)
+        ])
+        db.session.commit()
+
+    client = app.test_client()
+    headers = login(client)
+    etag = client.get('/api/journeys/', headers=headers).headers['ETag']
+    headers['If-None-Match'] = etag
+
+    def request():
+        assert client.get('/api/journeys/', headers=headers).status_code == 304
+
+    for label, bloom, cache in CONFIGURATIONS:
+        app.config.update(BLOCKLIST_BLOOM_ENABLED=bloom, BLOCKLIST_CACHE_ENABLED=cache)
+        report(label, measure(request, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
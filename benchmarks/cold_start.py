@@ -0,0 +1,59 @@
+"""
+Worker cold start time and memory.
+
+Starts --runs fresh interpreters that each import server.app, build the WSGI
+app the way gunicorn does (server.app:app) and serve one request, and
+reports the time to a ready app and the peak RSS before and after that
+request. Uses the testing config on a throwaway SQLite file unless
+BENCH_DATABASE_URL is set.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from .common import report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child; prints timings and peak RSS (KiB) as JSON
+CHILD = """
+import json, resource, time
+start = time.perf_counter()
+import server.app
+app = server.app.app
+ready = time.perf_counter() - start
+rss_ready = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+app.test_client().get('/')
+first = time.perf_counter() - start
+print(json.dumps({'ready': ready, 'first': first, 'rss_ready': rss_ready,
+                  'rss_first': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ, FLASK_CONFIG='testing')
+    env.pop('RENDER', None)
+    env['TEST_DATABASE_URL'] = os.environ.get('BENCH_DATABASE_URL') or \
+        f"sqlite:///{tempfile.mkdtemp(prefix='skillforge-bench-')}/bench.db"
+
+    runs = [
+        json.loads(subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env, check=True,
+                                  capture_output=True, text=True).stdout)
+        for _ in range(args.runs)
+    ]
+    report('import + build app', [run['ready'] for run in runs])
+    report('import + build app + first request', [run['first'] for run in runs])
+    for key, label in (('rss_ready', 'peak RSS with app built'), ('rss_first', 'peak RSS after first request')):
+        values = sorted(run[key] for run in runs)
+        print(f'{label:<40} min={values[0] / 1024:.1f}MiB median={values[len(values) // 2] / 1024:.1f}MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Shared setup and reporting for the benchmark scripts."""
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+PASSWORD = 'benchmark-password'
+
+
+def make_app(**overrides):
+    """
+    Builds a testing app on BENCH_DATABASE_URL or a fresh SQLite file, with
+    its tables created. Overrides are applied to the config class, so
+    extensions that read their settings in init_app see them too.
+    """
+    from server.app import create_app
+    from server.config import TestingConfig
+    from server.models import db
+
+    TestingConfig.SQLALCHEMY_DATABASE_URI = os.environ.get('BENCH_DATABASE_URL') or \
+        f"sqlite:///{tempfile.mkdtemp(prefix='skillforge-bench-')}/bench.db"
+    for name, value in overrides.items():
+        setattr(TestingConfig, name, value)
+    app = create_app('testing')
+    # Slow-request warnings would interleave with the results
+    logging.getLogger('server.instrumentation').setLevel(logging.ERROR)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def create_user(app, username='bench'):
+    """Inserts a user with PASSWORD and returns its id."""
+    from server.models import User, db
+
+    with app.app_context():
+        user = User(username=username, email=f'{username}@example.com', password=PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def login(client, username='bench'):
+    """Logs in through the API and returns the Authorization header for the token."""
+    response = client.post('/api/auth/login', json={'login': username, 'password': PASSWORD})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def measure(operation, iterations, warmup=10):
+    """Runs operation warmup + iterations times and returns the timed durations in seconds."""
+    for _ in range(warmup):
+        operation()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples):
+    """Prints mean and tail latencies of samples in milliseconds."""
+    cuts = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+    print(f'{label:<40} n={len(samples):<6} mean={statistics.fmean(samples) * 1000:8.3f}ms '
+          f'p50={cuts[49] * 1000:8.3f}ms p95={cuts[94] * 1000:8.3f}ms p99={cuts[98] * 1000:8.3f}ms')
@@ -0,0 +1,76 @@
+"""
+Deleting a journey with 50,000 steps.
+
+Times a hard DELETE /api/journeys/<id> (one statement; the steps go through
+ON DELETE CASCADE), a soft delete followed by purge-deleted-journeys, and
+the previous approach of loading every step into the session and deleting
+them through the ORM.
+"""
+import argparse
+import time
+
+from .common import create_user, login, make_app, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=50000)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--purge-batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    from sqlalchemy import insert
+    from server import main as cli
+    from server.models import Journey, Step, db
+
+    app = make_app()
+    user_id = create_user(app)
+    client = app.test_client()
+    headers = login(client)
+    cli.get_app = lambda: app
+
+    def seed():
+        with app.app_context():
+            journey = Journey(title='Benchmark', user_id=user_id, steps_total=args.steps)
+            db.session.add(journey)
+            db.session.flush()
+            db.session.execute(insert(Step), [
+                {'title': f'Step {n}', 'journey_id': journey.id, 'position': (n + 1) * 1024.0}
+                for n in range(args.steps)
+            ])
+            db.session.commit()
+            return journey.id
+
+    def hard_delete(journey_id):
+        app.config['SOFT_DELETE_JOURNEYS'] = False
+        assert client.delete(f'/api/journeys/{journey_id}', headers=headers).status_code == 200
+
+    def soft_delete_and_purge(journey_id):
+        app.config['SOFT_DELETE_JOURNEYS'] = True
+        assert client.delete(f'/api/journeys/{journey_id}', headers=headers).status_code == 200
+        cli.purge_deleted_journeys(batch_size=args.purge_batch_size)
+
+    def orm_delete(journey_id):
+        with app.app_context():
+            journey = db.session.get(Journey, journey_id)
+            for step in journey.steps:
+                db.session.delete(step)
+            db.session.delete(journey)
+            db.session.commit()
+
+    for label, operation in (
+        ('hard DELETE (ON DELETE CASCADE)', hard_delete),
+        ('soft delete + purge', soft_delete_and_purge),
+        ('ORM delete of every step (previous)', orm_delete),
+    ):
+        samples = []
+        for _ in range(args.rounds):
+            journey_id = seed()
+            start = time.perf_counter()
+            operation(journey_id)
+            samples.append(time.perf_counter() - start)
+        report(f'{label}, {args.steps} steps', samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Login throughput through the bounded bcrypt pool.
+
+Fires --logins logins from --concurrency client threads at the production
+work factor and reports completed logins per second, latency, and how many
+were shed with a 503 because the hashing queue was full.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import PASSWORD, create_user, make_app, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=12, help='BCRYPT_LOG_ROUNDS')
+    parser.add_argument('--pool-size', type=int, default=None, help='BCRYPT_POOL_SIZE (default: CPU count)')
+    args = parser.parse_args()
+
+    overrides = {'BCRYPT_LOG_ROUNDS': args.rounds}
+    if args.pool_size:
+        overrides['BCRYPT_POOL_SIZE'] = args.pool_size
+    app = make_app(**overrides)
+    create_user(app)
+
+    def login(_):
+        client = app.test_client()
+        start = time.perf_counter()
+        status = client.post('/api/auth/login', json={'login': 'bench', 'password': PASSWORD}).status_code
+        return status, time.perf_counter() - start
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(login, range(args.logins)))
+    elapsed = time.perf_counter() - started
+
+    succeeded = [duration for status, duration in results if status == 200]
+    shed = sum(1 for status, _ in results if status == 503)
+    print(f"rounds={args.rounds} pool={app.config['BCRYPT_POOL_SIZE']} concurrency={args.concurrency}: "
+          f"{len(succeeded) / elapsed:.1f} logins/s, {shed} shed with 503, "
+          f"{len(results) - len(succeeded) - shed} other failures")
+    if succeeded:
+        report('successful login latency', succeeded)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Overhead of the rate limiter on a request.
+
+Times an authenticated GET /api/journeys/ with the limiter disabled and
+enabled (memory backend, limits high enough that nothing is refused), and a
+bare MemoryBackend.consume call, so the per-request cost can be told apart
+from the bucket update itself.
+"""
+import argparse
+
+from .common import create_user, login, make_app, measure, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    from server.rate_limit import MemoryBackend, parse_limit
+
+    unlimited = '1000000/second'
+    app = make_app(
+        RATE_LIMIT_ENABLED=True, RATE_LIMIT_BACKEND='memory',
+        RATE_LIMITS={'auth_bp': unlimited, 'journey_bp': unlimited}
+    )
+    create_user(app)
+    client = app.test_client()
+    headers = login(client)
+
+    def list_journeys():
+        assert client.get('/api/journeys/', headers=headers).status_code == 200
+
+    # Warms the response and blocklist caches so neither timed run pays for it
+    measure(list_journeys, args.iterations)
+    for enabled in (False, True):
+        app.config['RATE_LIMIT_ENABLED'] = enabled
+        label = 'GET /api/journeys/, limiter ' + ('on' if enabled else 'off')
+        report(label, measure(list_journeys, args.iterations))
+
+    backend = MemoryBackend(app.config['RATE_LIMIT_SIZE'])
+    capacity, rate = parse_limit(unlimited)
+    report('MemoryBackend.consume', measure(
+        lambda: backend.consume('ratelimit:journey_bp:user:1', capacity, rate), args.iterations
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Loading and encoding a journey with 1,000 steps.
+
+Compares the original path (hydrated ORM entities, stdlib JSON) with the
+projection queries from server.serializers under the stdlib provider and
+under the orjson provider, timing the query plus the JSON encoding.
+"""
+import argparse
+
+from flask.json.provider import DefaultJSONProvider
+
+from .common import create_user, make_app, measure, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    from sqlalchemy import select
+    from server.models import Journey, Step, db
+    from server.serializers import (
+        JOURNEY_COLUMNS, STEP_COLUMNS, OrjsonProvider, journey_detail, orjson, progress
+    )
+
+    app = make_app()
+    user_id = create_user(app)
+    with app.app_context():
+        journey = Journey(title='Benchmark', description='A long journey', user_id=user_id,
+                          steps_total=args.steps)
+        db.session.add(journey)
+        db.session.flush()
+        db.session.add_all(
+            Step(title=f'Step {n}', description='Something to do', journey_id=journey.id,
+                 is_complete=n % 3 == 0, position=(n + 1) * 1024.0)
+            for n in range(args.steps)
+        )
+        db.session.commit()
+        journey_id = journey.id
+
+    stdlib = DefaultJSONProvider(app)
+
+    def entities_stdlib():
+        # The serialization the endpoints used before the projection queries
+        journey = db.session.get(Journey, journey_id)
+        steps = journey.steps.order_by(Step.position, Step.id).all()
+        stdlib.dumps({
+            'id': journey.id, 'title': journey.title, 'description': journey.description,
+            'created_at': journey.created_at.isoformat(), 'user_id': journey.user_id,
+            'steps_count': journey.steps_total, 'steps_completed': journey.steps_completed,
+            'progress': progress(journey.steps_total, journey.steps_completed),
+            'steps': [{
+                'id': step.id, 'title': step.title, 'description': step.description,
+                'is_complete': step.is_complete, 'created_at': step.created_at.isoformat(),
+                'position': step.position
+            } for step in steps]
+        })
+        db.session.expunge_all()
+
+    def projection(provider):
+        def run():
+            row = db.session.execute(select(*JOURNEY_COLUMNS).where(Journey.id == journey_id)).one()
+            steps = db.session.execute(
+                select(*STEP_COLUMNS).where(Step.journey_id == journey_id).order_by(Step.position, Step.id)
+            ).all()
+            provider.dumps(journey_detail(row, steps))
+        return run
+
+    cases = [
+        ('ORM entities + stdlib json', entities_stdlib),
+        ('projection + stdlib json', projection(stdlib)),
+    ]
+    if orjson is not None:
+        cases.append(('projection + orjson', projection(OrjsonProvider(app))))
+
+    with app.app_context():
+        for label, operation in cases:
+            report(f'{label} ({args.steps} steps)', measure(operation, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Batch step endpoints against the one-request-per-step path.
+
+Creates and then updates --steps steps in a journey, once with a request per
+step (POST /api/steps/, PUT /api/steps/<id>) and once with a single
+/steps:batch request, and reports the time for the whole set each way.
+"""
+import argparse
+import itertools
+
+from .common import create_user, login, make_app, measure, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=100, help='steps created and updated per round')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    create_user(app)
+    client = app.test_client()
+    headers = login(client)
+
+    def new_journey():
+        response = client.post('/api/journeys/', headers=headers, json={'title': 'Benchmark'})
+        return response.get_json()['id']
+
+    def create_one_at_a_time():
+        journey_id = new_journey()
+        for n in range(args.steps):
+            client.post('/api/steps/', headers=headers, json={'journey_id': journey_id, 'title': f'Step {n}'})
+
+    def create_batch():
+        journey_id = new_journey()
+        client.post(f'/api/journeys/{journey_id}/steps:batch', headers=headers,
+                    json={'steps': [{'title': f'Step {n}'} for n in range(args.steps)]})
+
+    journey_id = new_journey()
+    response = client.post(f'/api/journeys/{journey_id}/steps:batch', headers=headers,
+                           json={'steps': [{'title': f'Step {n}'} for n in range(args.steps)]})
+    step_ids = [result['id'] for result in response.get_json()['results']]
+    flips = itertools.count()
+
+    def update_one_at_a_time():
+        is_complete = next(flips) % 2 == 0
+        for step_id in step_ids:
+            client.put(f'/api/steps/{step_id}', headers=headers, json={'is_complete': is_complete})
+
+    def update_batch():
+        is_complete = next(flips) % 2 == 0
+        client.patch('/api/steps:batch', headers=headers,
+                     json={'steps': [{'id': step_id, 'is_complete': is_complete} for step_id in step_ids]})
+
+    for label, operation in (
+        (f'create {args.steps}, one at a time', create_one_at_a_time),
+        (f'create {args.steps}, batch', create_batch),
+        (f'update {args.steps}, one at a time', update_one_at_a_time),
+        (f'update {args.steps}, batch', update_batch),
+    ):
+        report(label, measure(operation, args.rounds, warmup=2))
+
+
+if __name__ == '__main__':
+    main()
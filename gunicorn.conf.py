@@ -0,0 +1,61 @@
+"""
+Gunicorn production profile for the SkillForge API.
+
+Run from the repository root with `gunicorn` (this file is picked up
+automatically). Workers and threads are sized from the CPU count and the
+per-worker SQLAlchemy pool so the fleet never opens more connections than
+DB_MAX_CONNECTIONS allows. Every setting can be overridden with its usual
+environment variable.
+"""
+import multiprocessing
+import os
+import sys
+
+# Gunicorn reads this file before the app directory is on sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server.config import config as app_configs
+
+# Same selection as create_app
+_settings = app_configs['production' if os.getenv('RENDER') else os.getenv('FLASK_CONFIG', 'development')]
+
+wsgi_app = 'server.app:app'
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = 'gthread'
+
+# Each worker may hold pool_size + max_overflow connections at once, and as many
+# again on the async engine's separate pool when ASYNC_READS is on (see async_db)
+_pool_connections = _settings.DB_POOL_SIZE + _settings.DB_MAX_OVERFLOW
+_connections_per_worker = _pool_connections * (2 if _settings.ASYNC_READS else 1)
+_db_max_connections = int(os.getenv('DB_MAX_CONNECTIONS', 0))
+
+workers = int(os.getenv('WEB_CONCURRENCY', 0)) or multiprocessing.cpu_count() * 2 + 1
+if _db_max_connections:
+    workers = max(1, min(workers, _db_max_connections // _connections_per_worker))
+
+# More threads than pooled connections would only queue on the pool
+threads = int(os.getenv('GUNICORN_THREADS', 0)) or max(1, min(4, _pool_connections))
+
+# Import the app once in the master so workers share its memory copy-on-write
+preload_app = True
+
+# Recycle workers periodically, staggered so they do not all restart together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    """Drops any pooled connections inherited from the master process."""
+    from server.models import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the parent's sockets alone; the child just starts a fresh pool
+            engine.dispose(close=False)
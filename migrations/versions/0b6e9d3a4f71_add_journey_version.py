@@ -0,0 +1,26 @@
+"""Add version column to journeys for ETags
+
+Revision ID: 0b6e9d3a4f71
+Revises: f4d1a7c3e856
+Create Date: 2026-10-18 11:43:09.563218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6e9d3a4f71'
+down_revision = 'f4d1a7c3e856'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('journeys', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('journeys', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,48 @@
+"""Never reuse journey ids on SQLite
+
+Revision ID: 2e6b8d4f9a13
+Revises: 9c4e1f7a2b60
+Create Date: 2026-10-18 17:48:09.260731
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2e6b8d4f9a13'
+down_revision = '9c4e1f7a2b60'
+branch_labels = None
+depends_on = None
+
+# The full-text triggers as created by 8e3f5b20c6a7; the table rebuild drops them
+FTS_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS journeys_fts_insert AFTER INSERT ON journeys BEGIN "
+    "INSERT INTO journeys_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS journeys_fts_delete AFTER DELETE ON journeys BEGIN "
+    "INSERT INTO journeys_fts(journeys_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS journeys_fts_update AFTER UPDATE OF title, description ON journeys BEGIN "
+    "INSERT INTO journeys_fts(journeys_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO journeys_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+
+def _rebuild_journeys(autoincrement):
+    # Postgres sequences never hand out an id twice; SQLite reuses the highest
+    # rowid after a delete unless the table is declared AUTOINCREMENT
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('journeys', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for statement in FTS_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    _rebuild_journeys(True)
+
+
+def downgrade():
+    _rebuild_journeys(False)
@@ -0,0 +1,63 @@
+"""Add fractional positions to steps
+
+Revision ID: 3f7b9c2e5a14
+Revises: d9a4c6e13f58
+Create Date: 2026-10-18 14:12:48.227961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7b9c2e5a14'
+down_revision = 'd9a4c6e13f58'
+branch_labels = None
+depends_on = None
+
+
+def _recreate_fts_triggers(table):
+    # SQLite batch mode rebuilds the table to drop a column, which drops the full-text triggers on it
+    fts = f'{table}_fts'
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF title, description ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+        f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+    )
+
+
+def upgrade():
+    with op.batch_alter_table('steps', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('position', sa.Float(), server_default='0', nullable=False))
+
+    # Existing steps keep the creation order they were listed in, 1024 apart
+    op.execute("""
+        UPDATE steps SET position = ranked.position
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY journey_id ORDER BY created_at, id) * 1024.0 AS position
+            FROM steps
+        ) AS ranked
+        WHERE steps.id = ranked.id
+    """)
+
+    with op.batch_alter_table('steps', schema=None) as batch_op:
+        batch_op.create_index('ix_steps_journey_id_position_id', ['journey_id', 'position', 'id'], unique=False)
+        batch_op.drop_index('ix_steps_journey_id_created_at_id')
+
+
+def downgrade():
+    with op.batch_alter_table('steps', schema=None) as batch_op:
+        batch_op.create_index('ix_steps_journey_id_created_at_id', ['journey_id', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_steps_journey_id_position_id')
+        batch_op.drop_column('position')
+
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate_fts_triggers('steps')
@@ -0,0 +1,49 @@
+"""Add steps.completed_at and the user_daily_stats rollup
+
+Revision ID: 5c8a2e71b9d4
+Revises: 0b6e9d3a4f71
+Create Date: 2026-10-18 12:36:52.907114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c8a2e71b9d4'
+down_revision = '0b6e9d3a4f71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('steps', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table('user_daily_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('steps_completed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Completion times were never recorded, so creation time is the best available estimate
+    op.execute("UPDATE steps SET completed_at = created_at WHERE is_complete")
+    if op.get_bind().dialect.name == 'sqlite':
+        completed_day = "date(steps.completed_at)"
+    else:
+        completed_day = "CAST(steps.completed_at AT TIME ZONE 'UTC' AS date)"
+    op.execute(f"""
+        INSERT INTO user_daily_stats (user_id, day, steps_completed)
+        SELECT journeys.user_id, {completed_day}, count(*)
+        FROM steps JOIN journeys ON journeys.id = steps.journey_id
+        WHERE steps.is_complete AND steps.completed_at IS NOT NULL
+        GROUP BY journeys.user_id, {completed_day}
+    """)
+
+
+def downgrade():
+    op.drop_table('user_daily_stats')
+    with op.batch_alter_table('steps', schema=None) as batch_op:
+        batch_op.drop_column('completed_at')
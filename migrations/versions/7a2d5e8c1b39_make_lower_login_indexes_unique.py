@@ -0,0 +1,55 @@
+"""Make the lower(username) and lower(email) indexes unique
+
+Revision ID: 7a2d5e8c1b39
+Revises: 3f7b9c2e5a14
+Create Date: 2026-10-18 16:05:31.402817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2d5e8c1b39'
+down_revision = '3f7b9c2e5a14'
+branch_labels = None
+depends_on = None
+
+LOGIN_COLUMNS = ('username', 'email')
+
+
+def _case_duplicates(column):
+    """Groups of user ids whose `column` values are equal ignoring case."""
+    rows = op.get_bind().execute(sa.text(
+        f"SELECT lower({column}) AS login, id FROM users WHERE lower({column}) IN ("
+        f"SELECT lower({column}) FROM users GROUP BY lower({column}) HAVING count(*) > 1"
+        f") ORDER BY login, id"
+    ))
+    groups = {}
+    for login, user_id in rows:
+        groups.setdefault(login, []).append(user_id)
+    return list(groups.values())
+
+
+def upgrade():
+    # Users' logins are never rewritten here: accounts that differ only in case
+    # have to be merged or renamed by hand before the indexes can be unique
+    conflicts = [
+        f"{column} of users {', '.join(map(str, ids))}"
+        for column in LOGIN_COLUMNS for ids in _case_duplicates(column)
+    ]
+    if conflicts:
+        raise RuntimeError(
+            'Cannot make logins unique regardless of case; resolve these case-only duplicates first: '
+            + '; '.join(conflicts)
+        )
+
+    for column in LOGIN_COLUMNS:
+        op.drop_index(f'ix_users_lower_{column}', table_name='users')
+        op.create_index(f'ix_users_lower_{column}', 'users', [sa.text(f'lower({column})')], unique=True)
+
+
+def downgrade():
+    for column in LOGIN_COLUMNS:
+        op.drop_index(f'ix_users_lower_{column}', table_name='users')
+        op.create_index(f'ix_users_lower_{column}', 'users', [sa.text(f'lower({column})')], unique=False)
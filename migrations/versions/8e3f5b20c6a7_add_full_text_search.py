@@ -0,0 +1,62 @@
+"""Add full-text search to journeys and steps
+
+Revision ID: 8e3f5b20c6a7
+Revises: 5c8a2e71b9d4
+Create Date: 2026-10-18 13:02:14.518306
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3f5b20c6a7'
+down_revision = '5c8a2e71b9d4'
+branch_labels = None
+depends_on = None
+
+TABLES = ('journeys', 'steps')
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in TABLES:
+            fts = f'{table}_fts'
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5(title, description, content='{table}', content_rowid='id')")
+            op.execute(
+                f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {fts}_update AFTER UPDATE OF title, description ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+                f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+            )
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        return
+
+    # Postgres 12+: the generated column is filled for existing rows while the table is rewritten
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED")
+        op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in TABLES:
+            fts = f'{table}_fts'
+            for trigger in ('insert', 'delete', 'update'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
+        return
+
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
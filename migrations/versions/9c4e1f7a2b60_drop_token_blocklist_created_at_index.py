@@ -0,0 +1,26 @@
+"""Drop the token_blocklist created_at index
+
+Revision ID: 9c4e1f7a2b60
+Revises: 7a2d5e8c1b39
+Create Date: 2026-10-18 17:20:44.913502
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e1f7a2b60'
+down_revision = '7a2d5e8c1b39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The blocklist filter syncs on ids now, so nothing reads by created_at
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_created_at'))
+
+
+def downgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_token_blocklist_created_at'), ['created_at'], unique=False)
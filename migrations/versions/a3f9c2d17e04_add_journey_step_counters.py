@@ -0,0 +1,40 @@
+"""Add denormalized step counters to journeys
+
+Revision ID: a3f9c2d17e04
+Revises: 54856b809987
+Create Date: 2026-10-18 10:12:40.218331
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f9c2d17e04'
+down_revision = '54856b809987'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('journeys', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('steps_total', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('steps_completed', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill the counters from the existing steps
+    op.execute("""
+        UPDATE journeys SET
+            steps_total = (
+                SELECT count(*) FROM steps WHERE steps.journey_id = journeys.id
+            ),
+            steps_completed = (
+                SELECT count(*) FROM steps
+                WHERE steps.journey_id = journeys.id AND steps.is_complete
+            )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('journeys', schema=None) as batch_op:
+        batch_op.drop_column('steps_completed')
+        batch_op.drop_column('steps_total')
@@ -0,0 +1,32 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: c71e5b08d2a9
+Revises: a3f9c2d17e04
+Create Date: 2026-10-18 10:31:05.874120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71e5b08d2a9'
+down_revision = 'a3f9c2d17e04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('journeys', schema=None) as batch_op:
+        batch_op.create_index('ix_journeys_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('steps', schema=None) as batch_op:
+        batch_op.create_index('ix_steps_journey_id_created_at_id', ['journey_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('steps', schema=None) as batch_op:
+        batch_op.drop_index('ix_steps_journey_id_created_at_id')
+
+    with op.batch_alter_table('journeys', schema=None) as batch_op:
+        batch_op.drop_index('ix_journeys_user_id_created_at_id')
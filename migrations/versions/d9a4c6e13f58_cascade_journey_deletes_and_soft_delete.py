@@ -0,0 +1,73 @@
+"""Cascade journey and step deletes in the database and add soft delete
+
+Revision ID: d9a4c6e13f58
+Revises: 8e3f5b20c6a7
+Create Date: 2026-10-18 13:41:27.604183
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a4c6e13f58'
+down_revision = '8e3f5b20c6a7'
+branch_labels = None
+depends_on = None
+
+# Matches Postgres' default names for the unnamed constraints of the initial
+# schema, and lets batch mode find the reflected ones on SQLite
+NAMING_CONVENTION = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+
+
+def _recreate_fts_triggers(table):
+    # SQLite batch mode rebuilds the table, which drops the full-text triggers on it
+    fts = f'{table}_fts'
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF title, description ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+        f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+    )
+
+
+def _set_cascade(ondelete):
+    with op.batch_alter_table('journeys', schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('journeys_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('journeys_user_id_fkey', 'users', ['user_id'], ['id'], ondelete=ondelete)
+
+    with op.batch_alter_table('steps', schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('steps_journey_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('steps_journey_id_fkey', 'journeys', ['journey_id'], ['id'], ondelete=ondelete)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate_fts_triggers('journeys')
+        _recreate_fts_triggers('steps')
+
+
+def upgrade():
+    with op.batch_alter_table('journeys', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.create_index('ix_journeys_deleted_at', ['deleted_at'], unique=False,
+                              postgresql_where=sa.text('deleted_at IS NOT NULL'),
+                              sqlite_where=sa.text('deleted_at IS NOT NULL'))
+
+    _set_cascade('CASCADE')
+
+
+def downgrade():
+    _set_cascade(None)
+
+    with op.batch_alter_table('journeys', schema=None) as batch_op:
+        batch_op.drop_index('ix_journeys_deleted_at')
+        batch_op.drop_column('deleted_at')
+
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate_fts_triggers('journeys')
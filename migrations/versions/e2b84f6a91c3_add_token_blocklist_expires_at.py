@@ -0,0 +1,39 @@
+"""Add expires_at to token_blocklist
+
+Revision ID: e2b84f6a91c3
+Revises: c71e5b08d2a9
+Create Date: 2026-10-18 10:52:17.402936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b84f6a91c3'
+down_revision = 'c71e5b08d2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    # Existing rows were issued with the 24h JWT_ACCESS_TOKEN_EXPIRES
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("UPDATE token_blocklist SET expires_at = datetime(created_at, '+24 hours')")
+    else:
+        op.execute("UPDATE token_blocklist SET expires_at = created_at + interval '24 hours'")
+
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.alter_column('expires_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_token_blocklist_expires_at'), ['expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_token_blocklist_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_created_at'))
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_expires_at'))
+        batch_op.drop_column('expires_at')
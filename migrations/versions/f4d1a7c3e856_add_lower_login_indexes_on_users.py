@@ -0,0 +1,26 @@
+"""Add lower(username) and lower(email) indexes on users
+
+Revision ID: f4d1a7c3e856
+Revises: e2b84f6a91c3
+Create Date: 2026-10-18 11:20:44.119502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4d1a7c3e856'
+down_revision = 'e2b84f6a91c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_lower_username', 'users', [sa.text('lower(username)')], unique=False)
+    op.create_index('ix_users_lower_email', 'users', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_lower_email', table_name='users')
+    op.drop_index('ix_users_lower_username', table_name='users')
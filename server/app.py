@@ -1,24 +1,35 @@
 import os
 from flask import Flask, jsonify
-from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate 
-from datetime import timedelta
-from flask_cors import CORS
 
-# Importing the configuration and database instances
+# Importing the configuration
 from .config import config
-from .models import db, bcrypt, TokenBlocklist 
-
-# Importing the controller Blueprints
-from .controllers.auth_controller import auth_bp
-from .controllers.journey_controller import journey_bp
-from .controllers.step_controller import step_bp
 
 def create_app(config_name=None):
     """
     Application Factory Pattern:
     Creates and configures the Flask application.
     """
+    # Extensions and blueprints are imported here so that importing this
+    # module (e.g. from the CLI) stays cheap until an app is actually built
+    from flask_jwt_extended import JWTManager
+    from flask_migrate import Migrate
+    from flask_cors import CORS
+
+    from .models import db, bcrypt, password_hasher
+    from .hashing import HashingOverloaded
+    from .blocklist import blocklist_cache
+    from .response_cache import response_cache
+    from .async_db import async_db
+    from .rate_limit import rate_limiter
+    from . import db_pool, instrumentation, serializers
+
+    from .controllers.auth_controller import auth_bp
+    from .controllers.journey_controller import journey_bp
+    from .controllers.step_controller import step_bp, step_batch_bp
+    from .controllers.user_controller import user_bp
+    from .controllers.search_controller import search_bp
+    from .controllers.admin_controller import admin_bp
+
     # --- THIS IS THE FIX ---
     # If the RENDER environment variable is present, we know we are in production.
     if os.getenv('RENDER'):
@@ -33,23 +44,44 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
 
+    if app.config['PROXY_FIX_X_FOR']:
+        # Client IPs (for rate limits) come from X-Forwarded-For set by the trusted proxies
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
     # Initialize extensions with the app
     db.init_app(app)
+    db_pool.init_app(app, db)
+    instrumentation.init_app(app, db)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
+    blocklist_cache.init_app(app)
+    response_cache.init_app(app)
+    async_db.init_app(app)
+    serializers.init_app(app)
     jwt = JWTManager(app)
+    rate_limiter.init_app(app)
     migrate = Migrate(app, db)
-    CORS(app, origins=["https://skill-forge-self.vercel.app"])
+    CORS(app, origins=["https://skill-forge-self.vercel.app"], expose_headers=["X-Next-Cursor", "ETag", "Retry-After"])
 
     @jwt.token_in_blocklist_loader
     def check_if_token_in_blocklist(jwt_header, jwt_payload: dict):
-        jti = jwt_payload["jti"]
-        token = db.session.query(TokenBlocklist.id).filter_by(jti=jti).scalar()
-        return token is not None
+        return blocklist_cache.is_revoked(jwt_payload)
     
+    @app.errorhandler(HashingOverloaded)
+    def handle_hashing_overloaded(error):
+        response = jsonify({"msg": "Server is busy, please try again shortly"})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
     # Register all the controller blueprints with their URL prefixes
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(journey_bp, url_prefix='/api/journeys')
     app.register_blueprint(step_bp, url_prefix='/api/steps')
+    app.register_blueprint(step_batch_bp, url_prefix='/api')
+    app.register_blueprint(user_bp, url_prefix='/api/users')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
 
     # A simple root route to confirm the API is running
     @app.route('/')
@@ -58,9 +90,15 @@ def create_app(config_name=None):
         
     return app
 
-app = create_app()
+def __getattr__(name):
+    # The WSGI app (server.app:app) is built on first access rather than at import
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
 
 
@@ -0,0 +1,115 @@
+"""
+Optional asyncio execution for read-only statements.
+
+With ASYNC_READS enabled, the journey and step read endpoints run their
+SELECTs on an SQLAlchemy AsyncEngine (asyncpg) instead of the psycopg2
+session. Flask itself stays WSGI, so each worker process owns one event loop
+on a background thread that holds the async connection pool. Request threads
+hand statements to it and wait for the rows, so a worker serves no more
+requests at once than with the session; it only changes the driver, and it
+opens a second pool (counted by gunicorn.conf.py). Compare p99 with
+`python -m benchmarks.async_reads` before turning it on.
+"""
+import asyncio
+import os
+import threading
+
+from flask import abort, current_app
+from sqlalchemy import event
+
+from .models import db
+
+
+def _async_url(app):
+    uri = app.config.get('ASYNC_DATABASE_URI') or app.config['SQLALCHEMY_DATABASE_URI']
+    for scheme in ('postgresql+psycopg2://', 'postgresql://', 'postgres://'):
+        if uri.startswith(scheme):
+            uri = 'postgresql+asyncpg://' + uri[len(scheme):]
+            break
+    if app.config['DB_PGBOUNCER_MODE'] and 'prepared_statement_cache_size' not in uri:
+        # PgBouncer in transaction mode cannot keep prepared statements across transactions
+        uri += ('&' if '?' in uri else '?') + 'prepared_statement_cache_size=0'
+    return uri
+
+
+class _AsyncState:
+    """An event loop thread and the async engine bound to it, for one process."""
+
+    def __init__(self, app):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        config = app.config
+        connect_args = {}
+        if config['DB_PGBOUNCER_MODE']:
+            connect_args['statement_cache_size'] = 0
+        else:
+            connect_args['server_settings'] = {'statement_timeout': str(config['DB_STATEMENT_TIMEOUT_MS'])}
+
+        self.pid = os.getpid()
+        self.engine = create_async_engine(
+            _async_url(app),
+            pool_size=config['DB_POOL_SIZE'],
+            max_overflow=config['DB_MAX_OVERFLOW'],
+            pool_timeout=config['DB_POOL_TIMEOUT'],
+            pool_recycle=config['DB_POOL_RECYCLE'],
+            pool_pre_ping=config['DB_POOL_PRE_PING'],
+            connect_args=connect_args
+        )
+        if config['DB_PGBOUNCER_MODE']:
+            timeout = int(config['DB_STATEMENT_TIMEOUT_MS'])
+
+            @event.listens_for(self.engine.sync_engine, 'begin')
+            def set_statement_timeout(connection):
+                connection.exec_driver_sql(f'SET LOCAL statement_timeout = {timeout}')
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='async-db', daemon=True)
+        self.thread.start()
+
+
+class AsyncDatabase:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        # Created on first use, and again after a fork, since loops and sockets do not survive one
+        app.extensions['async_db'] = None
+
+    def _state(self):
+        app = current_app._get_current_object()
+        state = app.extensions.get('async_db')
+        if state is None or state.pid != os.getpid():
+            with self._lock:
+                state = app.extensions.get('async_db')
+                if state is None or state.pid != os.getpid():
+                    state = app.extensions['async_db'] = _AsyncState(app)
+        return state
+
+    @staticmethod
+    async def _fetch_all(engine, statement):
+        async with engine.connect() as connection:
+            result = await connection.execute(statement)
+            return result.all()
+
+    def fetch_all(self, statement):
+        state = self._state()
+        future = asyncio.run_coroutine_threadsafe(self._fetch_all(state.engine, statement), state.loop)
+        return future.result()
+
+
+async_db = AsyncDatabase()
+
+
+def fetch_all(statement):
+    """Runs a read-only statement on the async engine when ASYNC_READS is on, else on the session."""
+    if current_app.config['ASYNC_READS']:
+        return async_db.fetch_all(statement)
+    return db.session.execute(statement).all()
+
+
+def fetch_one_or_404(statement):
+    rows = fetch_all(statement.limit(1))
+    if not rows:
+        abort(404)
+    return rows[0]
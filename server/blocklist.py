@@ -0,0 +1,136 @@
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+
+from .bloom import BloomFilter
+from .cache import TTLCache
+from .models import db, TokenBlocklist
+from .queries import revoked_token
+
+# Re-read this many ids below the high-water mark on each incremental
+# refresh, so a row whose id was allocated before the last sync but that
+# committed after it is usually picked up; rows that commit later than that
+# are loaded by the next full rebuild (BLOCKLIST_BLOOM_REBUILD)
+SYNC_ID_OVERLAP = 100
+
+
+class _BloomState:
+    """Per-app Bloom filter of live revoked JTIs and its sync bookkeeping."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        # Highest token_blocklist id loaded into the filter; ids come from the
+        # database, so unlike timestamps they do not depend on any host's clock
+        self.last_id = 0
+        self.next_refresh = 0.0
+        self.next_rebuild = 0.0
+
+
+class TokenBlocklistCache:
+    """
+    Answers JWT blocklist checks per worker without a token_blocklist query
+    on every request.
+
+    A Bloom filter of live revoked JTIs rules out most tokens outright. It is
+    refreshed incrementally every BLOCKLIST_BLOOM_REFRESH seconds, so a logout
+    handled by another worker is normally seen within that interval, and
+    rebuilt from every live row every BLOCKLIST_BLOOM_REBUILD seconds, which
+    bounds how long a revocation that committed out of id order can be
+    missed. Tokens the filter
+    cannot rule out go through a TTL cache: revoked tokens are cached until
+    they expire, others only for BLOCKLIST_CACHE_NEGATIVE_TTL seconds.
+    """
+
+    def init_app(self, app):
+        app.extensions['blocklist_cache'] = TTLCache(app.config['BLOCKLIST_CACHE_SIZE'])
+        app.extensions['blocklist_bloom'] = _BloomState()
+
+    @property
+    def cache(self):
+        return current_app.extensions['blocklist_cache']
+
+    @property
+    def enabled(self):
+        return current_app.config['BLOCKLIST_CACHE_ENABLED']
+
+    @property
+    def bloom_enabled(self):
+        return current_app.config['BLOCKLIST_BLOOM_ENABLED']
+
+    def is_revoked(self, jwt_payload):
+        """Returns True if the token has been revoked, consulting the filter and cache first."""
+        jti = jwt_payload['jti']
+        if self.bloom_enabled:
+            state = current_app.extensions['blocklist_bloom']
+            self._refresh_bloom(state)
+            if jti not in state.bloom:
+                return False
+
+        if self.enabled:
+            revoked = self.cache.get(jti)
+            if revoked is not None:
+                return revoked
+
+        revoked = db.session.execute(revoked_token(jti)).scalar() is not None
+
+        if self.enabled:
+            if revoked:
+                self.cache.set(jti, True, jwt_payload['exp'] - time.time())
+            else:
+                self.cache.set(jti, False, current_app.config['BLOCKLIST_CACHE_NEGATIVE_TTL'])
+        return revoked
+
+    def mark_revoked(self, jwt_payload):
+        """Records a freshly revoked token in this worker's filter and cache."""
+        jti = jwt_payload['jti']
+        if self.bloom_enabled:
+            state = current_app.extensions['blocklist_bloom']
+            with state.lock:
+                if state.bloom is not None:
+                    state.bloom.add(jti)
+        if self.enabled:
+            self.cache.set(jti, True, jwt_payload['exp'] - time.time())
+
+    def _refresh_bloom(self, state):
+        """Loads JTIs revoked since the last sync, rebuilding the filter when it is full or due."""
+        if state.bloom is not None and time.monotonic() < state.next_refresh:
+            return
+        with state.lock:
+            if state.bloom is not None and time.monotonic() < state.next_refresh:
+                return
+
+            live = db.session.query(TokenBlocklist.id, TokenBlocklist.jti).filter(
+                TokenBlocklist.expires_at > datetime.utcnow()
+            )
+            now = time.monotonic()
+            if state.bloom is None or state.bloom.count >= state.bloom.capacity or now >= state.next_rebuild:
+                # Full rebuild from unexpired rows, which also sheds pruned JTIs
+                rows = live.all()
+                bloom = BloomFilter(
+                    max(current_app.config['BLOCKLIST_BLOOM_CAPACITY'], 2 * len(rows)),
+                    current_app.config['BLOCKLIST_BLOOM_ERROR_RATE']
+                )
+                state.next_rebuild = now + current_app.config['BLOCKLIST_BLOOM_REBUILD']
+            else:
+                bloom = state.bloom
+                rows = live.filter(TokenBlocklist.id > state.last_id - SYNC_ID_OVERLAP).all()
+
+            for row_id, jti in rows:
+                if jti not in bloom:
+                    bloom.add(jti)
+                state.last_id = max(state.last_id, row_id)
+
+            state.bloom = bloom
+            state.next_refresh = now + current_app.config['BLOCKLIST_BLOOM_REFRESH']
+
+    def stats(self):
+        stats = self.cache.stats()
+        bloom = current_app.extensions['blocklist_bloom'].bloom
+        stats['bloom_items'] = bloom.count if bloom is not None else 0
+        return stats
+
+
+blocklist_cache = TokenBlocklistCache()
@@ -0,0 +1,44 @@
+import hmac
+
+from flask import Blueprint, current_app, request
+
+from ..blocklist import blocklist_cache
+
+admin_bp = Blueprint('admin_bp', __name__)
+
+
+def _gauge(lines, name, help_text, value, metric_type='gauge'):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {metric_type}')
+    lines.append(f'{name} {value}')
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for this worker; requires the METRICS_TOKEN bearer token."""
+    token = current_app.config['METRICS_TOKEN']
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    # Hide the endpoint entirely unless a token is configured and matches
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        return {"msg": "Not Found"}, 404
+
+    registry = current_app.extensions.get('metrics')
+    lines = registry.render() if registry else []
+
+    cache = blocklist_cache.stats()
+    _gauge(lines, 'skillforge_blocklist_cache_hits_total', 'Blocklist cache hits.', cache['hits'], 'counter')
+    _gauge(lines, 'skillforge_blocklist_cache_misses_total', 'Blocklist cache misses.', cache['misses'], 'counter')
+    _gauge(lines, 'skillforge_blocklist_cache_size', 'Entries in the blocklist cache.', cache['size'])
+
+    pool_metrics = current_app.extensions.get('pool_metrics')
+    if pool_metrics is not None:
+        from ..models import db
+        pool = pool_metrics.snapshot(db.engine.pool)
+        _gauge(lines, 'skillforge_db_pool_checkouts_total', 'Connection checkouts.', pool['checkouts'], 'counter')
+        _gauge(lines, 'skillforge_db_pool_timeouts_total', 'Checkouts that timed out.', pool['timeouts'], 'counter')
+        _gauge(lines, 'skillforge_db_pool_wait_seconds_total', 'Time spent checking out connections.', pool['wait_seconds_total'], 'counter')
+        _gauge(lines, 'skillforge_db_pool_wait_seconds_max', 'Longest single checkout.', pool['wait_seconds_max'])
+        if 'checked_out' in pool:
+            _gauge(lines, 'skillforge_db_pool_checked_out', 'Connections currently checked out.', pool['checked_out'])
+
+    return current_app.response_class('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
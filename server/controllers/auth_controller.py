@@ -1,10 +1,29 @@
 from flask import request, jsonify, Blueprint
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from sqlalchemy.exc import IntegrityError
 from ..models import db, User, TokenBlocklist
+from ..blocklist import blocklist_cache
+from ..queries import login_candidates
 from datetime import datetime
 
 auth_bp = Blueprint('auth_bp', __name__)
 
+# Conflict responses keyed by the users column whose unique constraint was violated
+DUPLICATE_FIELD_MESSAGES = {
+    'username': "Username already exists",
+    'email': "Email already in use",
+}
+
+def _duplicate_field(error):
+    """Works out which unique column an IntegrityError on users was raised for."""
+    diag = getattr(error.orig, 'diag', None)
+    # Postgres names the constraint (users_email_key); SQLite only puts the column in the message
+    detail = (getattr(diag, 'constraint_name', None) or str(error.orig)).lower()
+    for field in DUPLICATE_FIELD_MESSAGES:
+        if field in detail:
+            return field
+    return None
+
 @auth_bp.route('/register', methods=['POST'])
 def register_user():
     """Handles new user registration with username and email."""
@@ -12,19 +31,21 @@ def register_user():
     if not data or not data.get('username') or not data.get('password') or not data.get('email'):
         return jsonify({"msg": "Username, email, and password are required"}), 400
 
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({"msg": "Username already exists"}), 409
-    
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({"msg": "Email already in use"}), 409
-    
     user = User(
         username=data['username'],
         email=data['email'],
         password=data['password']
     )
     db.session.add(user)
-    db.session.commit()
+    # Let the unique constraints reject duplicates instead of pre-checking, which was racy
+    try:
+        db.session.commit()
+    except IntegrityError as error:
+        db.session.rollback()
+        field = _duplicate_field(error)
+        if field is None:
+            raise
+        return jsonify({"msg": DUPLICATE_FIELD_MESSAGES[field], "field": field}), 409
 
     return jsonify({"msg": "User created successfully"}), 201
 
@@ -37,11 +58,16 @@ def login_user():
     if not login_identifier or not password:
         return jsonify({"msg": "Username/email and password are required"}), 400
 
-    user = User.query.filter(
-        (User.username == login_identifier) | (User.email == login_identifier)
-    ).first()
+    # Matches the unique lower(username)/lower(email) indexes. One user's username can still
+    # equal another's email, so each candidate is tried, exact-case matches first
+    candidates = db.session.scalars(login_candidates(login_identifier)).all()
+    user = next((candidate for candidate in candidates if candidate.verify_password(password)), None)
 
-    if user and user.verify_password(password):
+    if user:
+        if user.password_needs_rehash():
+            # Upgrade the stored hash to the current work factor while we have the plaintext
+            user.password = password
+            db.session.commit()
         access_token = create_access_token(identity=user.id)
         return jsonify(access_token=access_token), 200
 
@@ -52,9 +78,15 @@ def login_user():
 @jwt_required()
 def logout_user():
     """Logs out the user by adding their token to the blocklist."""
-    jti = get_jwt()["jti"]
+    token = get_jwt()
     now = datetime.utcnow()
-    db.session.add(TokenBlocklist(jti=jti, created_at=now))
+    db.session.add(TokenBlocklist(
+        jti=token["jti"],
+        created_at=now,
+        expires_at=datetime.utcfromtimestamp(token["exp"])
+    ))
     db.session.commit()
+    # Write through so this worker rejects the token without another lookup
+    blocklist_cache.mark_revoked(token)
     return jsonify({"msg": "Successfully logged out"}), 200
 
@@ -1,7 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, abort, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models import Journey, Step, db  # Corrected relative import
-from datetime import datetime
+from ..pagination import InvalidCursor, keyset_paginate
+from ..etags import is_fresh, make_etag, not_modified, with_etag
+from ..response_cache import response_cache
+from ..serializers import journey_detail, journey_summary
+from ..queries import journeys_of, journeys_stamp, owned_journey, steps_of
+from ..async_db import fetch_all, fetch_one_or_404
+from ..export import FORMATS, export_chunks, gzip_chunks
+from ..importer import ImportValidationError, import_ndjson
+from ..pagination import decode_cursor
+from sqlalchemy import delete, update
+from datetime import datetime, timezone
 
 # The url_prefix is now handled in app.py during registration for clarity
 journey_bp = Blueprint('journey_bp', __name__)
@@ -10,42 +20,107 @@ journey_bp = Blueprint('journey_bp', __name__)
 @journey_bp.route('/', methods=['GET'])
 @jwt_required()  # <-- ADDED: This route now requires a valid token
 def get_user_journeys():
-    """Get all journeys for the currently logged-in user."""
+    """Get a page of journeys for the currently logged-in user."""
     user_id = get_jwt_identity()  # <-- ADDED: Get the ID of the logged-in user
-    journeys = Journey.query.filter_by(user_id=user_id).all() # <-- FIXED: Only get journeys for this user
 
-    return jsonify([{
-        'id': journey.id,
-        'title': journey.title,
-        'description': journey.description,
-        'created_at': journey.created_at.isoformat(),
-        'user_id': journey.user_id,
-        'steps_count': journey.steps.count()
-    } for journey in journeys])
+    # Any create, update or delete changes the count, the version sum or the highest id
+    stamp = fetch_all(journeys_stamp(user_id))[0]
+    etag = make_etag('journeys', user_id, *stamp)
+    if is_fresh(etag):
+        return not_modified(etag)
+
+    # Keyed by the ETag, so any write to this user's journeys misses the old entry
+    try:
+        response = response_cache.get_or_render(f'response:{etag}', lambda: _render_journeys(user_id))
+    except InvalidCursor:
+        return jsonify({"msg": "Invalid pagination cursor"}), 400
+    return with_etag(response, etag)
+
+
+def _render_journeys(user_id):
+    # Step totals come from the denormalized counters, so the steps table is never touched
+    journeys, next_cursor = keyset_paginate(
+        journeys_of(user_id), Journey.created_at, Journey.id
+    )
+
+    response = jsonify([journey_summary(journey) for journey in journeys])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@journey_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_journeys():
+    """Stream all of the logged-in user's journeys and steps as NDJSON or CSV."""
+    user_id = get_jwt_identity()
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in FORMATS:
+        return jsonify({"msg": "Unsupported export format, use one of: " + ", ".join(FORMATS)}), 400
+
+    # Errors cannot be reported once the body has started, so the cursor is checked up front
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            decode_cursor(cursor, Journey.created_at)
+        except InvalidCursor:
+            return jsonify({"msg": "Invalid pagination cursor"}), 400
+
+    chunks = export_chunks(export_format, user_id, cursor)
+    headers = {'Content-Disposition': f'attachment; filename="skillforge-export.{export_format}"'}
+    if 'gzip' in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return Response(stream_with_context(chunks), mimetype=FORMATS[export_format], headers=headers)
+
+
+@journey_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_journeys():
+    """Import journeys and steps from an NDJSON request body for the logged-in user."""
+    user_id = get_jwt_identity()
+    max_bytes = current_app.config['IMPORT_MAX_BYTES']
+    if request.content_length is None:
+        return jsonify({"msg": "Content-Length is required"}), 411
+    if request.content_length > max_bytes:
+        return jsonify({"msg": f"Import body must be at most {max_bytes} bytes"}), 413
+
+    # Read line by line off the request stream, never as one string
+    try:
+        result = import_ndjson(request.stream, user_id)
+    except ImportValidationError as exc:
+        return jsonify({"msg": f"Import rejected: {exc.error_count} invalid lines", "errors": exc.errors}), 400
+    return jsonify(result.to_dict()), 201
 
 
 @journey_bp.route('/<int:journey_id>', methods=['GET'])
 @jwt_required() # <-- ADDED: This route now requires a valid token
 def get_journey(journey_id):
-    """Get a single journey, ensuring it belongs to the logged-in user."""
+    """Get a single journey and a page of its steps, ensuring it belongs to the logged-in user."""
     user_id = get_jwt_identity() # <-- ADDED: Get the ID of the logged-in user
     # <-- FIXED: Query now checks for both journey ID and user ID for security
-    journey = Journey.query.filter_by(id=journey_id, user_id=user_id).first_or_404()
-    
-    return jsonify({
-        'id': journey.id,
-        'title': journey.title,
-        'description': journey.description,
-        'created_at': journey.created_at.isoformat(),
-        'user_id': journey.user_id,
-        'steps': [{
-            'id': step.id,
-            'title': step.title,
-            'description': step.description,
-            'is_complete': step.is_complete,
-            'created_at': step.created_at.isoformat()
-        } for step in journey.steps]
-    })
+    journey = fetch_one_or_404(owned_journey(journey_id, user_id))
+
+    # The version covers the journey and all of its steps, so a match skips loading them
+    etag = make_etag('journey', journey.id, journey.version)
+    if is_fresh(etag):
+        return not_modified(etag)
+
+    try:
+        response = response_cache.get_or_render(f'response:{etag}', lambda: _render_journey(journey))
+    except InvalidCursor:
+        return jsonify({"msg": "Invalid pagination cursor"}), 400
+    return with_etag(response, etag)
+
+
+def _render_journey(journey):
+    steps, next_cursor = keyset_paginate(steps_of(journey.id), Step.position, Step.id)
+
+    response = jsonify(journey_detail(journey, steps))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 
 @journey_bp.route('/', methods=['POST'])
@@ -79,11 +154,12 @@ def update_journey(journey_id):
     """Update a journey, ensuring it belongs to the logged-in user."""
     user_id = get_jwt_identity() # <-- ADDED: Get the ID of the logged-in user
     # <-- FIXED: Query now checks for both journey ID and user ID for security
-    journey = Journey.query.filter_by(id=journey_id, user_id=user_id).first_or_404()
+    journey = Journey.query.filter(Journey.id == journey_id, Journey.owned_by(user_id)).first_or_404()
     
     data = request.get_json()
     journey.title = data.get('title', journey.title)
     journey.description = data.get('description', journey.description)
+    journey.version = Journey.version + 1
     db.session.commit()
     
     return jsonify({'message': 'Journey updated successfully'})
@@ -94,10 +170,20 @@ def update_journey(journey_id):
 def delete_journey(journey_id):
     """Delete a journey, ensuring it belongs to the logged-in user."""
     user_id = get_jwt_identity() # <-- ADDED: Get the ID of the logged-in user
-    # <-- FIXED: Query now checks for both journey ID and user ID for security
-    journey = Journey.query.filter_by(id=journey_id, user_id=user_id).first_or_404()
-    
-    db.session.delete(journey) # The 'cascade' in your model will delete the steps
+    owned = (Journey.id == journey_id, Journey.owned_by(user_id))
+    if current_app.config['SOFT_DELETE_JOURNEYS']:
+        # Hides the journey at once; purge-deleted-journeys removes it and its steps in batches
+        statement = update(Journey).where(*owned).values(
+            deleted_at=datetime.now(timezone.utc), version=Journey.version + 1
+        )
+    else:
+        # One DELETE; the steps go with it through ON DELETE CASCADE, never loaded into the session
+        statement = delete(Journey).where(*owned)
+    deleted = db.session.execute(
+        statement.returning(Journey.id).execution_options(synchronize_session=False)
+    ).first()
+    if deleted is None:
+        abort(404)
     db.session.commit()
     
-    return jsonify({'message': 'Journey deleted successfully'})
\ No newline at end of file
+    return jsonify({'message': 'Journey deleted successfully'})
@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..pagination import get_page_size
+from ..search import InvalidSearchCursor, decode_search_cursor, encode_search_cursor, render_headline, search
+
+search_bp = Blueprint('search_bp', __name__)
+
+MAX_QUERY_LENGTH = 200
+
+
+@search_bp.route('', methods=['GET'])
+@jwt_required()
+def search_my_content():
+    """Ranked full-text search over the logged-in user's journeys and steps."""
+    user_id = get_jwt_identity()
+    query_text = request.args.get('q', '').strip()
+    if not query_text:
+        return jsonify({"msg": "Missing search query"}), 400
+    if len(query_text) > MAX_QUERY_LENGTH:
+        return jsonify({"msg": f"Search query must be at most {MAX_QUERY_LENGTH} characters"}), 400
+
+    # Ranked results have no stable sort key to seek on, so the cursor carries an offset
+    offset = 0
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            offset = decode_search_cursor(cursor)
+        except InvalidSearchCursor:
+            return jsonify({"msg": "Invalid pagination cursor"}), 400
+
+    limit = get_page_size()
+    rows = search(user_id, query_text, limit + 1, offset)
+    response = jsonify([{
+        'type': row.kind,
+        'id': row.id,
+        'journey_id': row.journey_id,
+        'title': row.title,
+        'rank': float(row.rank),
+        'headline': render_headline(row.headline)
+    } for row in rows[:limit]])
+    if len(rows) > limit:
+        response.headers['X-Next-Cursor'] = encode_search_cursor(offset + limit)
+    return response
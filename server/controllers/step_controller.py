@@ -1,9 +1,57 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, abort, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models import Step, Journey, db  # Corrected relative import
-from datetime import datetime
+from sqlalchemy import case, func, insert, not_, select, tuple_, update
+from ..models import Step, Journey, UserDailyStats, db  # Corrected relative import
+from ..models.step import POSITION_GAP
+from ..etags import is_fresh, make_etag, not_modified, with_etag
+from ..serializers import step_detail
+from ..async_db import fetch_one_or_404
+from ..queries import owned_step, owned_step_delete, owned_step_state, owned_step_update, step_update_after
+from collections import defaultdict
+from datetime import datetime, timezone
 
 step_bp = Blueprint('step_bp', __name__)
+# Batch routes live outside /api/steps (e.g. /api/steps:batch), so they get their own blueprint
+step_batch_bp = Blueprint('step_batch_bp', __name__)
+
+def _touch_journey(journey_id, total=0, completed=0):
+    """Bumps a journey's version and applies deltas to its step counters in the current transaction."""
+    db.session.query(Journey).filter_by(id=journey_id).update({
+        Journey.version: Journey.version + 1,
+        Journey.steps_total: Journey.steps_total + total,
+        Journey.steps_completed: Journey.steps_completed + completed
+    }, synchronize_session=False)
+
+def _utc_day(moment):
+    return (moment.astimezone(timezone.utc) if moment.tzinfo else moment).date()
+
+def _completion_change(completed_at, was_complete, is_complete, day_deltas, now):
+    """Returns the step's new completed_at and records the matching daily rollup delta."""
+    if is_complete and not was_complete:
+        day_deltas[_utc_day(now)] += 1
+        return now
+    if was_complete and not is_complete:
+        if completed_at is not None:
+            day_deltas[_utc_day(completed_at)] -= 1
+        return None
+    return completed_at
+
+def _next_position(journey_id):
+    """Position just past the journey's last step; one lookup on (journey_id, position)."""
+    last = db.session.execute(select(func.max(Step.position)).where(Step.journey_id == journey_id)).scalar()
+    return (last or 0) + POSITION_GAP
+
+def _rebalance_positions(journey_id):
+    """Respaces a journey's steps POSITION_GAP apart, keeping their order, in one UPDATE."""
+    ranked = select(
+        Step.id,
+        (func.row_number().over(order_by=(Step.position, Step.id)) * POSITION_GAP).label('position')
+    ).where(Step.journey_id == journey_id).subquery('ranked')
+    db.session.execute(
+        update(Step).where(Step.id == ranked.c.id).values(position=ranked.c.position)
+        .execution_options(synchronize_session=False)
+    )
+    _touch_journey(journey_id)
 
 @step_bp.route('/', methods=['POST'])
 @jwt_required() # <-- ADDED: This route now requires a valid token
@@ -19,7 +67,7 @@ def create_step():
 
     # Verify that the user owns the journey they are adding a step to
     journey_id = data['journey_id']
-    journey = Journey.query.filter_by(id=journey_id, user_id=user_id).first()
+    journey = Journey.query.filter(Journey.id == journey_id, Journey.owned_by(user_id)).first()
     if not journey:
         return jsonify({"msg": "Journey not found or you don't have permission to access it"}), 404
     # --- FIX ENDS HERE ---
@@ -27,9 +75,11 @@ def create_step():
     step = Step(
         title=data['title'],
         description=data.get('description'),
-        journey_id=journey_id
+        journey_id=journey_id,
+        position=_next_position(journey.id)
     )
     db.session.add(step)
+    _touch_journey(journey.id, total=1)
     db.session.commit()
     
     return jsonify({
@@ -44,33 +94,54 @@ def get_step(step_id):
     """Get a single step, ensuring it belongs to the logged-in user."""
     user_id = get_jwt_identity() # <-- ADDED: Get the logged-in user's ID
     # <-- FIXED: Query now checks that the step belongs to one of the user's journeys
-    step = db.session.query(Step).join(Journey).filter(
-        Step.id == step_id,
-        Journey.user_id == user_id
-    ).first_or_404()
-    
-    return jsonify({
-        'id': step.id,
-        'title': step.title,
-        'description': step.description,
-        'is_complete': step.is_complete
-    })
+    step = fetch_one_or_404(owned_step(step_id, user_id))
+
+    etag = make_etag('step', step.id, step.version)
+    if is_fresh(etag):
+        return not_modified(etag)
+
+    return with_etag(jsonify(step_detail(step)), etag)
+
+def _update_owned_step(step_id, user_id, values):
+    """Applies `values` to the user's step in one statement; returns old and new state, or None."""
+    if db.engine.dialect.name == 'sqlite':
+        # SQLite has no row locks; taking the database write lock before reading the old
+        # state means nothing else can commit between the read and the real UPDATE
+        before = db.session.execute(owned_step_state(step_id, user_id)).first()
+        if before is None:
+            return None
+        return db.session.execute(step_update_after(step_id, values, before)).first()
+
+    return db.session.execute(owned_step_update(step_id, user_id, values)).first()
+
+def _apply_completion_change(user_id, row):
+    """Updates the journey counters and the daily rollup from a step's old and new state."""
+    day_deltas = defaultdict(int)
+    _completion_change(row.old_completed_at, row.old_is_complete, row.is_complete, day_deltas, row.completed_at)
+    _touch_journey(row.journey_id, completed=int(row.is_complete) - int(row.old_is_complete))
+    UserDailyStats.record_completions(user_id, day_deltas)
 
 @step_bp.route('/<int:step_id>', methods=['PUT'])
 @jwt_required() # <-- ADDED: This route now requires a valid token
 def update_step(step_id):
     """Update a step, ensuring it belongs to the logged-in user."""
     user_id = get_jwt_identity() # <-- ADDED: Get the logged-in user's ID
-    # <-- FIXED: Query now checks that the step belongs to one of the user's journeys
-    step = db.session.query(Step).join(Journey).filter(
-        Step.id == step_id,
-        Journey.user_id == user_id
-    ).first_or_404()
+    data = request.get_json() or {}
 
-    data = request.get_json()
-    step.title = data.get('title', step.title)
-    step.description = data.get('description', step.description)
-    step.is_complete = data.get('is_complete', step.is_complete)
+    # Ownership is checked in the same statement as the write
+    values = {field: data[field] for field in ('title', 'description') if field in data}
+    if 'is_complete' in data:
+        values['is_complete'] = bool(data['is_complete'])
+        values['completed_at'] = case(
+            (Step.is_complete, Step.completed_at), else_=datetime.now(timezone.utc)
+        ) if values['is_complete'] else None
+    if not values:
+        values['title'] = Step.title
+
+    row = _update_owned_step(step_id, user_id, values)
+    if row is None:
+        abort(404)
+    _apply_completion_change(user_id, row)
     db.session.commit()
     
     return jsonify({'message': 'Step updated successfully'})
@@ -80,13 +151,12 @@ def update_step(step_id):
 def delete_step(step_id):
     """Delete a step, ensuring it belongs to the logged-in user."""
     user_id = get_jwt_identity() # <-- ADDED: Get the logged-in user's ID
-    # <-- FIXED: Query now checks that the step belongs to one of the user's journeys
-    step = db.session.query(Step).join(Journey).filter(
-        Step.id == step_id,
-        Journey.user_id == user_id
-    ).first_or_404()
-    
-    db.session.delete(step)
+    # Ownership is checked in the DELETE itself, and RETURNING gives what the counters need
+    row = db.session.execute(owned_step_delete(step_id, user_id)).first()
+    if row is None:
+        abort(404)
+
+    _touch_journey(row.journey_id, total=-1, completed=-int(row.is_complete))
     db.session.commit()
     
     return jsonify({'message': 'Step deleted successfully'})
@@ -96,15 +166,227 @@ def delete_step(step_id):
 def toggle_complete(step_id):
     """Toggle step completion status"""
     user_id = get_jwt_identity()
-    step = db.session.query(Step).join(Journey).filter(
-        Step.id == step_id,
-        Journey.user_id == user_id
-    ).first_or_404()
-
-    step.is_complete = not step.is_complete
+    # Flipped in SQL against the locked row, so concurrent toggles never lose an update
+    row = _update_owned_step(step_id, user_id, {
+        Step.is_complete: not_(Step.is_complete),
+        Step.completed_at: case((Step.is_complete, None), else_=datetime.now(timezone.utc))
+    })
+    if row is None:
+        abort(404)
+    _apply_completion_change(user_id, row)
     db.session.commit()
     
     return jsonify({
         'message': 'Step completion status updated',
-        'is_complete': step.is_complete
-    })
\ No newline at end of file
+        'is_complete': row.is_complete
+    })
+
+@step_bp.route('/<int:step_id>/move', methods=['PUT'])
+@jwt_required()
+def move_step(step_id):
+    """
+    Move a step within its journey, next to another step: {"after_id": id}
+    or {"before_id": id}. "after_id": null moves it to the top and
+    "before_id": null to the bottom. Only the moved step's row is rewritten.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or ('after_id' in data) == ('before_id' in data):
+        return jsonify({"msg": "Request body must contain exactly one of 'after_id' or 'before_id'"}), 400
+
+    step = db.session.execute(select(Step.id, Step.journey_id).join(Journey).where(
+        Step.id == step_id,
+        Journey.owned_by(user_id)
+    )).first()
+    if step is None:
+        abort(404)
+
+    after = 'after_id' in data
+    anchor_id = data['after_id' if after else 'before_id']
+    for attempt in range(2):
+        siblings = select(Step.position, Step.id).where(Step.journey_id == step.journey_id, Step.id != step.id)
+        anchor = None
+        if anchor_id is not None:
+            if isinstance(anchor_id, int):
+                anchor = db.session.execute(siblings.where(Step.id == anchor_id)).first()
+            if anchor is None:
+                return jsonify({"msg": "The anchor step must be another step in the same journey"}), 400
+
+        # The neighbour on the far side of the anchor, or the first/last step without one
+        if after:
+            lower = anchor
+            if anchor is not None:
+                siblings = siblings.where(tuple_(Step.position, Step.id) > (anchor.position, anchor.id))
+            upper = db.session.execute(siblings.order_by(Step.position, Step.id).limit(1)).first()
+        else:
+            upper = anchor
+            if anchor is not None:
+                siblings = siblings.where(tuple_(Step.position, Step.id) < (anchor.position, anchor.id))
+            lower = db.session.execute(siblings.order_by(Step.position.desc(), Step.id.desc()).limit(1)).first()
+
+        if lower is None and upper is None:
+            position = POSITION_GAP
+        elif lower is None:
+            position = upper.position - POSITION_GAP
+        elif upper is None:
+            position = lower.position + POSITION_GAP
+        else:
+            position = (lower.position + upper.position) / 2
+            if not lower.position < position < upper.position:
+                # Repeated moves into the same spot used up the gap; respace and look again
+                if attempt:
+                    return jsonify({"msg": "Could not find a free position, please retry"}), 409
+                _rebalance_positions(step.journey_id)
+                continue
+        break
+
+    db.session.execute(
+        update(Step).where(Step.id == step.id).values(position=position)
+        .execution_options(synchronize_session=False)
+    )
+    _touch_journey(step.journey_id)
+    db.session.commit()
+
+    return jsonify({'message': 'Step moved successfully', 'position': position})
+
+
+def _read_batch():
+    """Returns the 'steps' list from a batch request body, or an error response."""
+    data = request.get_json(silent=True)
+    items = data.get('steps') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"msg": "Request body must contain a non-empty 'steps' list"}), 400)
+
+    max_size = current_app.config['STEP_BATCH_MAX_SIZE']
+    if len(items) > max_size:
+        return None, (jsonify({"msg": f"A batch may contain at most {max_size} steps"}), 413)
+    return items, None
+
+def _batch_item_error(item, title_required):
+    """Why a batch item's fields cannot be stored, or None if they can."""
+    if not title_required and not any(field in item for field in ('title', 'description', 'is_complete')):
+        return 'Nothing to update'
+    if title_required or 'title' in item:
+        title = item.get('title')
+        if not isinstance(title, str) or not title:
+            return 'Missing title'
+        if len(title) > Step.title.type.length:
+            return f'Title must be at most {Step.title.type.length} characters'
+    description = item.get('description')
+    if description is not None and not isinstance(description, str):
+        return 'Description must be a string'
+    # A JSON boolean only; bool("false") is True
+    if 'is_complete' in item and not isinstance(item['is_complete'], bool):
+        return 'is_complete must be a boolean'
+    return None
+
+@step_batch_bp.route('/journeys/<int:journey_id>/steps:batch', methods=['POST'])
+@jwt_required()
+def create_steps_batch(journey_id):
+    """Create many steps in a journey with one ownership check and one INSERT."""
+    user_id = get_jwt_identity()
+    items, error = _read_batch()
+    if error:
+        return error
+
+    journey = Journey.query.filter(Journey.id == journey_id, Journey.owned_by(user_id)).first()
+    if not journey:
+        return jsonify({"msg": "Journey not found or you don't have permission to access it"}), 404
+
+    now = datetime.now(timezone.utc)
+    position = _next_position(journey.id)
+    results = [None] * len(items)
+    rows, row_indexes = [], []
+    for index, item in enumerate(items):
+        item_error = _batch_item_error(item, True) if isinstance(item, dict) else 'Missing title'
+        if item_error:
+            results[index] = {'index': index, 'error': item_error}
+            continue
+        is_complete = item.get('is_complete', False)
+        rows.append({
+            'title': item['title'],
+            'description': item.get('description'),
+            'is_complete': is_complete,
+            'completed_at': now if is_complete else None,
+            'journey_id': journey.id,
+            'position': position
+        })
+        position += POSITION_GAP
+        row_indexes.append(index)
+
+    if not rows:
+        return jsonify({"msg": "No valid steps in batch", 'results': results}), 400
+
+    step_ids = db.session.scalars(
+        insert(Step).returning(Step.id, sort_by_parameter_order=True), rows
+    ).all()
+    for index, step_id in zip(row_indexes, step_ids):
+        results[index] = {'index': index, 'id': step_id}
+    completed = sum(row['is_complete'] for row in rows)
+    _touch_journey(journey.id, total=len(rows), completed=completed)
+    UserDailyStats.record_completions(user_id, {_utc_day(now): completed})
+    db.session.commit()
+
+    return jsonify({'created': len(rows), 'results': results}), 201
+
+@step_batch_bp.route('/steps:batch', methods=['PATCH'])
+@jwt_required()
+def update_steps_batch():
+    """Update many steps with one ownership query and one executemany UPDATE."""
+    user_id = get_jwt_identity()
+    items, error = _read_batch()
+    if error:
+        return error
+
+    requested_ids = [
+        item['id'] for item in items if isinstance(item, dict) and isinstance(item.get('id'), int)
+    ]
+    # Locked so a concurrent write cannot change the state the counter deltas are computed from
+    owned = {
+        row.id: row for row in db.session.query(
+            Step.id, Step.journey_id, Step.is_complete, Step.completed_at
+        ).join(Journey).filter(
+            Step.id.in_(requested_ids),
+            Journey.owned_by(user_id)
+        ).with_for_update(of=Step)
+    }
+
+    now = datetime.now(timezone.utc)
+    results, updates = [], []
+    completed_deltas = defaultdict(int)
+    day_deltas = defaultdict(int)
+    for index, item in enumerate(items):
+        step_id = item.get('id') if isinstance(item, dict) else None
+        item_error = _batch_item_error(item, False) if isinstance(item, dict) else None
+        if item_error:
+            results.append({'index': index, 'id': step_id, 'error': item_error})
+            continue
+        current = owned.pop(step_id, None) if isinstance(step_id, int) else None
+        if current is None:
+            results.append({'index': index, 'id': step_id, 'error': 'Step not found or duplicated in batch'})
+            continue
+
+        values = {'id': step_id}
+        for field in ('title', 'description'):
+            if field in item:
+                values[field] = item[field]
+        completed_deltas[current.journey_id] += 0
+        if 'is_complete' in item:
+            values['is_complete'] = item['is_complete']
+            values['completed_at'] = _completion_change(
+                current.completed_at, current.is_complete, values['is_complete'], day_deltas, now
+            )
+            completed_deltas[current.journey_id] += int(values['is_complete']) - int(current.is_complete)
+        updates.append(values)
+        results.append({'index': index, 'id': step_id})
+
+    if not updates:
+        return jsonify({"msg": "No valid steps in batch", 'results': results}), 400
+
+    db.session.execute(update(Step), updates)
+    for journey_id, delta in completed_deltas.items():
+        _touch_journey(journey_id, completed=delta)
+    UserDailyStats.record_completions(user_id, day_deltas)
+    db.session.commit()
+
+    return jsonify({'updated': len(updates), 'results': results})
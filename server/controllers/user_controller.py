@@ -0,0 +1,71 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..async_db import fetch_all
+from ..queries import daily_rollup, stats_journeys
+from ..serializers import progress
+from datetime import datetime, timedelta, timezone
+
+user_bp = Blueprint('user_bp', __name__)
+
+
+def _streaks(active_days, today):
+    """Returns (current, longest) runs of consecutive active days, ordered oldest first."""
+    longest = run = 0
+    previous = None
+    for day in active_days:
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    # A streak is still alive if the last active day is today or yesterday
+    current = run if previous is not None and today - previous <= timedelta(days=1) else 0
+    return current, longest
+
+
+@user_bp.route('/me/stats', methods=['GET'])
+@jwt_required()
+def get_my_stats():
+    """Learning stats for the logged-in user, served from counters and the daily rollup."""
+    user_id = get_jwt_identity()
+    days = max(1, min(request.args.get('days', 30, type=int), 366))
+    weeks = max(1, min(request.args.get('weeks', 12, type=int), 104))
+    today = datetime.now(timezone.utc).date()
+
+    journeys = fetch_all(stats_journeys(user_id))
+
+    # One row per active day, so even years of history stay small
+    rollup = fetch_all(daily_rollup(user_id))
+    completed_by_day = {row.day: row.steps_completed for row in rollup}
+    current_streak, longest_streak = _streaks(list(completed_by_day), today)
+
+    daily = []
+    for offset in range(days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        daily.append({'date': day.isoformat(), 'steps_completed': completed_by_day.get(day, 0)})
+
+    this_week = today - timedelta(days=today.weekday())
+    weekly = []
+    for offset in range(weeks - 1, -1, -1):
+        week_start = this_week - timedelta(weeks=offset)
+        weekly.append({
+            'week_start': week_start.isoformat(),
+            'steps_completed': sum(completed_by_day.get(week_start + timedelta(days=i), 0) for i in range(7))
+        })
+
+    steps_total = sum(journey.steps_total for journey in journeys)
+    steps_completed = sum(journey.steps_completed for journey in journeys)
+    return jsonify({
+        'steps_total': steps_total,
+        'steps_completed': steps_completed,
+        'completion_rate': progress(steps_total, steps_completed),
+        'current_streak': current_streak,
+        'longest_streak': longest_streak,
+        'daily': daily,
+        'weekly': weekly,
+        'journeys': [{
+            'id': journey.id,
+            'title': journey.title,
+            'steps_count': journey.steps_total,
+            'steps_completed': journey.steps_completed,
+            'progress': progress(journey.steps_total, journey.steps_completed)
+        } for journey in journeys]
+    })
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Thread-safe counters for connection checkouts from the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, waited):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self, pool=None):
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_total,
+                'wait_seconds_max': self.wait_max,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+        return stats
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout, including waits for a free connection."""
+
+    metrics = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _create_connection(self):
+        if self.metrics is not None:
+            self.metrics.record_connect()
+        return super()._create_connection()
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def engine_options(config):
+    """Builds SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings for a Postgres URI."""
+    uri = config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if not uri.startswith(('postgresql', 'postgres://')):
+        return {}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if not config['DB_PGBOUNCER_MODE']:
+        # Session-level setting sent at connect time; PgBouncer in transaction
+        # mode rejects startup options, so that mode sets it per transaction instead
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    return options
+
+
+def init_app(app, db):
+    """
+    Attaches pool metrics, the per-transaction statement timeout in PgBouncer
+    mode, and foreign key enforcement on SQLite.
+    """
+    with app.app_context():
+        engine = db.engine
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = PoolMetrics()
+    app.extensions['pool_metrics'] = getattr(engine.pool, 'metrics', None) or PoolMetrics()
+
+    if app.config['DB_PGBOUNCER_MODE'] and engine.dialect.name == 'postgresql':
+        timeout = int(app.config['DB_STATEMENT_TIMEOUT_MS'])
+
+        @event.listens_for(engine, 'begin')
+        def set_statement_timeout(connection):
+            # SET LOCAL only lasts for the transaction, so nothing leaks to the
+            # next client PgBouncer hands this server connection to
+            connection.exec_driver_sql(f'SET LOCAL statement_timeout = {timeout}')
+
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def enable_foreign_keys(dbapi_connection, connection_record):
+            # SQLite ignores ON DELETE CASCADE unless foreign keys are switched on per connection
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA foreign_keys = ON')
+            cursor.close()
@@ -0,0 +1,27 @@
+import hashlib
+
+from flask import current_app, request
+
+
+def make_etag(*parts):
+    """Builds an ETag from version parts plus the query string (page cursor, limit)."""
+    tag = '-'.join(str(part) for part in parts)
+    if request.query_string:
+        tag += '-' + hashlib.blake2b(request.query_string, digest_size=6).hexdigest()
+    return tag
+
+
+def is_fresh(etag):
+    """True if the client's If-None-Match already holds this ETag."""
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified(etag):
+    return with_etag(current_app.response_class(status=304), etag)
+
+
+def with_etag(response, etag):
+    """Attaches a weak ETag and asks clients to revalidate before reusing the body."""
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,120 @@
+"""
+Streaming export of a user's journeys and steps as NDJSON or CSV.
+
+Rows come off a server-side cursor in batches of EXPORT_BATCH_SIZE and are
+encoded and sent as they arrive, so memory stays flat however many steps a
+user has. Every journey carries a resume cursor: passing it back as
+?cursor= restarts the export at that journey, including it.
+"""
+import csv
+import io
+import zlib
+
+from flask import current_app
+from sqlalchemy import select, tuple_
+
+from .models import db, Journey, Step
+from .pagination import decode_cursor, encode_cursor
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+CSV_HEADER = (
+    'journey_cursor', 'journey_id', 'journey_title', 'journey_description', 'journey_created_at',
+    'step_id', 'step_title', 'step_description', 'step_is_complete', 'step_created_at', 'step_completed_at'
+)
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def export_statement(user_id, cursor=None):
+    """Every journey of the user in (created_at, id) order, each with its steps in position order."""
+    statement = select(
+        Journey.id.label('journey_id'), Journey.title.label('journey_title'),
+        Journey.description.label('journey_description'), Journey.created_at.label('journey_created_at'),
+        Journey.steps_total, Journey.steps_completed,
+        Step.id.label('step_id'), Step.title.label('step_title'), Step.description.label('step_description'),
+        Step.is_complete.label('step_is_complete'), Step.created_at.label('step_created_at'),
+        Step.completed_at.label('step_completed_at')
+    ).outerjoin(Step, Step.journey_id == Journey.id).where(Journey.owned_by(user_id))
+    if cursor:
+        statement = statement.where(tuple_(Journey.created_at, Journey.id) >= decode_cursor(cursor, Journey.created_at))
+    return statement.order_by(Journey.created_at, Journey.id, Step.position, Step.id)
+
+
+def _batches(statement):
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    with db.engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+        yield from result.partitions()
+
+
+def _ndjson_chunks(statement):
+    dumps = current_app.json.dumps
+    current_journey = None
+    for rows in _batches(statement):
+        lines = []
+        for row in rows:
+            if row.journey_id != current_journey:
+                current_journey = row.journey_id
+                lines.append(dumps({
+                    'type': 'journey',
+                    'cursor': encode_cursor(row.journey_created_at, row.journey_id),
+                    'id': row.journey_id,
+                    'title': row.journey_title,
+                    'description': row.journey_description,
+                    'created_at': _isoformat(row.journey_created_at),
+                    'steps_count': row.steps_total,
+                    'steps_completed': row.steps_completed
+                }))
+            if row.step_id is not None:
+                lines.append(dumps({
+                    'type': 'step',
+                    'id': row.step_id,
+                    'journey_id': row.journey_id,
+                    'title': row.step_title,
+                    'description': row.step_description,
+                    'is_complete': row.step_is_complete,
+                    'created_at': _isoformat(row.step_created_at),
+                    'completed_at': _isoformat(row.step_completed_at)
+                }))
+        yield '\n'.join(lines) + '\n'
+
+
+def _csv_chunks(statement):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    # One row per step; a journey without steps gets a single row with the step columns empty
+    for rows in _batches(statement):
+        for row in rows:
+            writer.writerow((
+                encode_cursor(row.journey_created_at, row.journey_id), row.journey_id, row.journey_title,
+                row.journey_description, _isoformat(row.journey_created_at),
+                row.step_id, row.step_title, row.step_description, row.step_is_complete,
+                _isoformat(row.step_created_at), _isoformat(row.step_completed_at)
+            ))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_chunks(export_format, user_id, cursor=None):
+    """Text chunks of the export, one per batch of rows."""
+    statement = export_statement(user_id, cursor)
+    if export_format == 'csv':
+        return _csv_chunks(statement)
+    return _ndjson_chunks(statement)
+
+
+def gzip_chunks(chunks):
+    """Gzip-encodes a stream of text chunks, flushing after each so clients see progress."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+
+class HashingOverloaded(Exception):
+    """Raised when the password hashing queue is full and the request should be shed."""
+
+
+class _HashingPool:
+    """A bounded thread pool plus a semaphore capping queued and running jobs."""
+
+    def __init__(self, workers, queue_depth):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self.slots = threading.BoundedSemaphore(workers + queue_depth)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded per-app thread pool.
+    When BCRYPT_POOL_SIZE + BCRYPT_QUEUE_DEPTH jobs are already in flight,
+    new work is refused with HashingOverloaded instead of queueing without limit.
+    """
+
+    def __init__(self, bcrypt):
+        self.bcrypt = bcrypt
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        # The pool is created on first use so it is never inherited across a fork
+        app.extensions['password_hasher'] = None
+
+    def _pool(self):
+        app = current_app._get_current_object()
+        pool = app.extensions.get('password_hasher')
+        if pool is None:
+            with self._lock:
+                pool = app.extensions.get('password_hasher')
+                if pool is None:
+                    pool = _HashingPool(app.config['BCRYPT_POOL_SIZE'], app.config['BCRYPT_QUEUE_DEPTH'])
+                    app.extensions['password_hasher'] = pool
+        return pool
+
+    def _run(self, fn, *args):
+        pool = self._pool()
+        if not pool.slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            future = pool.executor.submit(fn, *args)
+        except BaseException:
+            pool.slots.release()
+            raise
+        future.add_done_callback(lambda _: pool.slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """Hashes password with the configured BCRYPT_LOG_ROUNDS."""
+        return self._run(self.bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if password_hash was made with a different cost than BCRYPT_LOG_ROUNDS."""
+        try:
+            rounds = int(password_hash.split('$')[2])
+        except (IndexError, ValueError):
+            return True
+        return rounds != current_app.config['BCRYPT_LOG_ROUNDS']
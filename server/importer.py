@@ -0,0 +1,318 @@
+"""
+Bulk import of journeys and steps from NDJSON.
+
+The input uses the export's record shapes: a {"type": "journey", "id": ...}
+record, followed by {"type": "step", "journey_id": ...} records that point at
+a journey id from the same file. Those ids only link records within the file;
+imported rows get fresh ids and belong to the importing user.
+
+Import runs in two passes. A streaming pass validates every line and spools
+clean rows to CSV files on disk, so the input is never held in memory and a
+file with any invalid line imports nothing. On Postgres the spooled files are
+then loaded with COPY into temporary staging tables and merged into journeys
+and steps with a handful of set-based statements. Other databases (SQLite in
+development) insert the spooled rows with executemany instead.
+"""
+import csv
+import json
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, text
+
+from .models import db, Journey, Step, UserDailyStats
+from .models.step import POSITION_GAP
+
+TITLE_MAX_LENGTH = 150
+MAX_REPORTED_ERRORS = 20
+# Spooled files stay in memory up to this size before moving to disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+INSERT_BATCH_SIZE = 1000
+
+JOURNEY_FIELDS = ('source_id', 'title', 'description', 'created_at')
+STEP_FIELDS = ('line', 'source_journey_id', 'title', 'description', 'is_complete', 'created_at', 'completed_at')
+
+
+class ImportValidationError(ValueError):
+    """Raised when an import file has invalid lines; nothing is imported."""
+
+    def __init__(self, errors, error_count):
+        super().__init__(f'{error_count} invalid lines')
+        self.errors = errors
+        self.error_count = error_count
+
+
+@dataclass
+class ImportResult:
+    journeys: int
+    steps: int
+    seconds: float
+
+    @property
+    def rows(self):
+        return self.journeys + self.steps
+
+    @property
+    def rows_per_second(self):
+        return round(self.rows / self.seconds, 1) if self.seconds else float(self.rows)
+
+    def to_dict(self):
+        return {
+            'journeys': self.journeys,
+            'steps': self.steps,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': self.rows_per_second
+        }
+
+
+def _timestamp(value, default):
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValueError('timestamps must be ISO 8601 strings')
+    moment = datetime.fromisoformat(value)
+    # Naive timestamps are taken as UTC, like the rest of the app
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _source_id(value, message):
+    # bool is an int subclass, and True == 1 would otherwise match journey 1
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(message)
+    return value
+
+
+def _title(record):
+    title = record.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError('title is required')
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f'title must be at most {TITLE_MAX_LENGTH} characters')
+    return title
+
+
+def _description(record):
+    description = record.get('description')
+    if description is not None and not isinstance(description, str):
+        raise ValueError('description must be a string')
+    # Empty and missing descriptions are both stored as NULL
+    return description or None
+
+
+class _Spool:
+    """Validated rows of one import, spooled to CSV in the layout COPY expects."""
+
+    def __init__(self):
+        self.journeys = tempfile.SpooledTemporaryFile(SPOOL_MAX_SIZE, mode='w+', newline='', encoding='utf-8')
+        self.steps = tempfile.SpooledTemporaryFile(SPOOL_MAX_SIZE, mode='w+', newline='', encoding='utf-8')
+        self.journey_writer = csv.writer(self.journeys)
+        self.step_writer = csv.writer(self.steps)
+        self.journey_count = 0
+        self.step_count = 0
+        self.step_counts = Counter()
+        self.completed_counts = Counter()
+        # Completions per UTC day, for the stats rollup
+        self.day_counts = Counter()
+
+    def rewind(self):
+        self.journeys.seek(0)
+        self.steps.seek(0)
+
+    def close(self):
+        self.journeys.close()
+        self.steps.close()
+
+    def read_journeys(self):
+        for source_id, title, description, created_at in csv.reader(self.journeys):
+            yield int(source_id), title, description or None, datetime.fromisoformat(created_at)
+
+    def read_steps(self):
+        for line, source_journey_id, title, description, is_complete, created_at, completed_at in csv.reader(self.steps):
+            yield (int(line), int(source_journey_id), title, description or None, is_complete == 't',
+                   datetime.fromisoformat(created_at), datetime.fromisoformat(completed_at) if completed_at else None)
+
+
+def validate(lines):
+    """Streams NDJSON lines into a _Spool, raising ImportValidationError if any line is invalid."""
+    spool = _Spool()
+    now = datetime.now(timezone.utc)
+    journey_ids = set()
+    errors = []
+    error_count = 0
+
+    for number, raw in enumerate(lines, start=1):
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8', errors='replace')
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+            if not isinstance(record, dict):
+                raise ValueError('each line must be a JSON object')
+            kind = record.get('type')
+            if kind == 'journey':
+                source_id = _source_id(record.get('id'), 'journey id must be an integer')
+                if source_id in journey_ids:
+                    raise ValueError(f'duplicate journey id {source_id}')
+                row = (source_id, _title(record), _description(record), _timestamp(record.get('created_at'), now))
+                journey_ids.add(source_id)
+                if not error_count:
+                    spool.journey_writer.writerow((row[0], row[1], row[2], row[3].isoformat()))
+                spool.journey_count += 1
+            elif kind == 'step':
+                source_journey_id = _source_id(record.get('journey_id'), 'step journey_id must be an integer')
+                if source_journey_id not in journey_ids:
+                    raise ValueError('step journey_id must match a journey earlier in the file')
+                is_complete = record.get('is_complete', False)
+                if not isinstance(is_complete, bool):
+                    raise ValueError('is_complete must be a boolean')
+                created_at = _timestamp(record.get('created_at'), now)
+                completed_at = _timestamp(record.get('completed_at'), created_at) if is_complete else None
+                row = (number, source_journey_id, _title(record), _description(record), is_complete, created_at, completed_at)
+                if not error_count:
+                    spool.step_writer.writerow((
+                        number, source_journey_id, row[2], row[3], 't' if is_complete else 'f',
+                        created_at.isoformat(), completed_at.isoformat() if completed_at else ''
+                    ))
+                    spool.step_counts[source_journey_id] += 1
+                    if is_complete:
+                        spool.completed_counts[source_journey_id] += 1
+                        spool.day_counts[completed_at.astimezone(timezone.utc).date()] += 1
+                spool.step_count += 1
+            else:
+                raise ValueError('type must be "journey" or "step"')
+        except (ValueError, TypeError) as exc:
+            # Keep validating to report every bad line, but stop spooling rows that will never load
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'line': number, 'msg': str(exc)})
+
+    if error_count:
+        spool.close()
+        raise ImportValidationError(errors, error_count)
+    spool.rewind()
+    return spool
+
+
+def _copy_load(spool, user_id):
+    connection = db.session.connection()
+    for statement in (
+        "CREATE TEMP TABLE import_journeys (source_id bigint PRIMARY KEY, title varchar(150) NOT NULL, "
+        "description text, created_at timestamptz NOT NULL, new_id integer) ON COMMIT DROP",
+        "CREATE TEMP TABLE import_steps (line bigint NOT NULL, source_journey_id bigint NOT NULL, "
+        "title varchar(150) NOT NULL, description text, is_complete boolean NOT NULL, "
+        "created_at timestamptz NOT NULL, completed_at timestamptz) ON COMMIT DROP",
+    ):
+        connection.exec_driver_sql(statement)
+
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY import_journeys ({', '.join(JOURNEY_FIELDS)}) FROM STDIN WITH (FORMAT csv)", spool.journeys
+        )
+        cursor.copy_expert(
+            f"COPY import_steps ({', '.join(STEP_FIELDS)}) FROM STDIN WITH (FORMAT csv)", spool.steps
+        )
+    finally:
+        cursor.close()
+
+    for statement in (
+        "ANALYZE import_journeys",
+        "ANALYZE import_steps",
+        # Ids are drawn up front so steps can be linked without a round trip per journey
+        "UPDATE import_journeys SET new_id = nextval(pg_get_serial_sequence('journeys', 'id'))",
+    ):
+        connection.exec_driver_sql(statement)
+    connection.execute(text("""
+        INSERT INTO journeys (id, title, description, created_at, user_id, steps_total, steps_completed, version)
+        SELECT j.new_id, j.title, j.description, j.created_at, :user_id,
+               coalesce(c.total, 0), coalesce(c.completed, 0), 1
+        FROM import_journeys j
+        LEFT JOIN (
+            SELECT source_journey_id, count(*) AS total, count(*) FILTER (WHERE is_complete) AS completed
+            FROM import_steps GROUP BY source_journey_id
+        ) c ON c.source_journey_id = j.source_id
+        ORDER BY j.created_at, j.source_id
+    """), {'user_id': user_id})
+    connection.execute(text("""
+        INSERT INTO steps (title, description, is_complete, created_at, completed_at, journey_id, position)
+        SELECT s.title, s.description, s.is_complete, s.created_at, s.completed_at, j.new_id,
+               row_number() OVER (PARTITION BY s.source_journey_id ORDER BY s.line) * :gap
+        FROM import_steps s JOIN import_journeys j ON j.source_id = s.source_journey_id
+        ORDER BY s.line
+    """), {'gap': POSITION_GAP})
+
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _executemany_load(spool, user_id):
+    new_ids = {}
+    for batch in _batched(spool.read_journeys()):
+        returned = db.session.execute(
+            insert(Journey).returning(Journey.id, sort_by_parameter_order=True),
+            [{
+                'title': title, 'description': description, 'created_at': created_at, 'user_id': user_id,
+                'steps_total': spool.step_counts[source_id],
+                'steps_completed': spool.completed_counts[source_id]
+            } for source_id, title, description, created_at in batch]
+        ).scalars().all()
+        new_ids.update(zip((source_id for source_id, *_ in batch), returned))
+
+    # Steps keep their order in the file
+    positions = Counter()
+    for batch in _batched(spool.read_steps()):
+        rows = []
+        for _, source_journey_id, title, description, is_complete, created_at, completed_at in batch:
+            positions[source_journey_id] += POSITION_GAP
+            rows.append({
+                'title': title, 'description': description, 'is_complete': is_complete,
+                'created_at': created_at, 'completed_at': completed_at,
+                'journey_id': new_ids[source_journey_id], 'position': positions[source_journey_id]
+            })
+        db.session.execute(insert(Step), rows)
+
+
+def import_ndjson(lines, user_id):
+    """
+    Imports journeys and steps from an iterable of NDJSON lines (str or bytes)
+    for `user_id` in a single transaction. Returns an ImportResult, or raises
+    ImportValidationError without touching the database.
+    """
+    started = time.perf_counter()
+    spool = validate(lines)
+    try:
+        if db.engine.dialect.name == 'postgresql':
+            _copy_load(spool, user_id)
+        else:
+            _executemany_load(spool, user_id)
+        UserDailyStats.record_completions(user_id, spool.day_counts)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        spool.close()
+    return ImportResult(spool.journey_count, spool.step_count, time.perf_counter() - started)
+
+
+def fixture_lines(journeys, steps_per_journey):
+    """NDJSON lines of a synthetic catalog, for benchmarking imports."""
+    for journey_id in range(1, journeys + 1):
+        yield json.dumps({'type': 'journey', 'id': journey_id, 'title': f'Journey {journey_id}',
+                          'description': f'Synthetic journey {journey_id} for import benchmarks'})
+        for position in range(1, steps_per_journey + 1):
+            yield json.dumps({'type': 'step', 'journey_id': journey_id, 'title': f'Step {position}',
+                              'description': f'Step {position} of journey {journey_id}',
+                              'is_complete': position % 3 == 0})
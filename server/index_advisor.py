@@ -0,0 +1,174 @@
+"""
+EXPLAIN-based check that the app's hot queries are served by indexes.
+
+Each entry in `_queries` is built by the same function the controllers, the
+blocklist, the export or the CLI use (see queries), bound to real ids from
+the connected database. Every plan is
+searched for full table scans, and a scan is reported when the table holds
+more than a row threshold, so small tables that are legitimately scanned do
+not trip it. Run it against a database seeded to a realistic size, e.g. with
+generate-import-fixture and import-journeys.
+"""
+import json
+from dataclasses import dataclass, field
+
+from flask import current_app
+from sqlalchemy import select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from .models import db, Journey, Step, TokenBlocklist, User
+from .export import export_statement
+from .pagination import keyset_page
+from .queries import (
+    daily_rollup, journeys_of, journeys_stamp, login_candidates, next_purge, owned_journey, owned_step,
+    owned_step_delete, owned_step_state, owned_step_update, revoked_token, stats_journeys, step_update_after,
+    steps_of
+)
+
+TABLES = ('users', 'journeys', 'steps', 'token_blocklist', 'user_daily_stats')
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+def _explained(prefix, element, compiler, **kw):
+    sql = compiler.process(element.statement, **kw)
+    # Compiling an UPDATE/DELETE flags the compiler as DML; the EXPLAIN itself returns plan rows
+    compiler.isinsert = compiler.isupdate = compiler.isdelete = False
+    return prefix + sql
+
+
+@compiles(_Explain, 'postgresql')
+def _explain_postgresql(element, compiler, **kw):
+    return _explained('EXPLAIN (FORMAT JSON) ', element, compiler, **kw)
+
+
+@compiles(_Explain, 'sqlite')
+def _explain_sqlite(element, compiler, **kw):
+    return _explained('EXPLAIN QUERY PLAN ', element, compiler, **kw)
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    # (table, rows) for every full scan of a table above the threshold
+    scans: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.scans
+
+
+def _samples():
+    """Ids around the journey with the most steps, so plans are costed against real data."""
+    journey = db.session.execute(
+        select(Journey.id, Journey.user_id, Journey.created_at).order_by(Journey.steps_total.desc()).limit(1)
+    ).first()
+    step = db.session.execute(
+        select(Step.id).where(Step.journey_id == journey.id).limit(1)
+    ).first() if journey else None
+    if step is None:
+        raise LookupError('The database has no journeys with steps; seed it before checking plans')
+    username = db.session.execute(select(User.username).where(User.id == journey.user_id)).scalar()
+    jti = db.session.execute(select(TokenBlocklist.jti).limit(1)).scalar() or '00000000-0000-0000-0000-000000000000'
+    return journey.user_id, journey, step, username, jti
+
+
+def _queries(dialect, user_id, journey, step, username, jti):
+    # A page query fetches one row more than the page to see whether another follows
+    page = current_app.config['DEFAULT_PAGE_SIZE'] + 1
+    # Rewrites the title to itself, so nothing would change even if the statement ran
+    values = {Step.title: Step.title}
+    if dialect == 'sqlite':
+        # SQLite takes the old state with a locking no-op UPDATE, then updates by id
+        owned_update = {
+            'steps: owned update (old state)': owned_step_state(step.id, user_id),
+            'steps: owned update': step_update_after(step.id, values, db.session.execute(
+                select(Step.is_complete, Step.completed_at).where(Step.id == step.id)
+            ).one()),
+        }
+    else:
+        owned_update = {'steps: owned update': owned_step_update(step.id, user_id, values)}
+
+    return {
+        'journeys: list page': keyset_page(journeys_of(user_id), Journey.created_at, Journey.id, page),
+        'journeys: list page after cursor': keyset_page(
+            journeys_of(user_id), Journey.created_at, Journey.id, page, (journey.created_at, journey.id)
+        ),
+        'journeys: list etag stamp': journeys_stamp(user_id),
+        'journeys: detail': owned_journey(journey.id, user_id),
+        'journeys: step page': keyset_page(steps_of(journey.id), Step.position, Step.id, page),
+        'journeys: export': export_statement(user_id),
+        # The lookups the database itself runs for ON DELETE CASCADE
+        'journeys: cascade to steps': select(Step.id).where(Step.journey_id == journey.id),
+        'users: cascade to journeys': select(Journey.id).where(Journey.user_id == user_id),
+        'journeys: purge queue': next_purge(),
+        'steps: get': owned_step(step.id, user_id),
+        **owned_update,
+        'steps: owned delete': owned_step_delete(step.id, user_id),
+        'stats: journeys': stats_journeys(user_id),
+        'stats: daily rollup': daily_rollup(user_id),
+        'auth: login lookup': login_candidates(username),
+        'auth: blocklist lookup': revoked_token(jti),
+    }
+
+
+def _table_rows(dialect):
+    if dialect == 'postgresql':
+        # Planner statistics, so the check never counts large tables
+        return {name: max(int(rows), 0) for name, rows in db.session.execute(text(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relname = ANY(:names)"
+        ), {'names': list(TABLES)})}
+    return {name: db.session.execute(text(f'SELECT count(*) FROM {name}')).scalar() for name in TABLES}
+
+
+def _postgres_scans(plan):
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        if node.get('Node Type') == 'Seq Scan':
+            yield node['Relation Name']
+        nodes.extend(node.get('Plans', ()))
+
+
+def _sqlite_scans(rows):
+    for row in rows:
+        detail = row[-1]
+        # "SCAN table" reads all of it, as does building an automatic index;
+        # "SEARCH ... USING INDEX" and FTS lookups do not
+        full_scan = detail.startswith('SCAN ') and 'VIRTUAL TABLE' not in detail
+        if full_scan or 'AUTOMATIC' in detail:
+            yield detail.split()[1]
+
+
+def check_plans(threshold, analyze=True):
+    """EXPLAINs every query and returns a PlanCheck per query."""
+    dialect = db.engine.dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        raise NotImplementedError(f'Plan checks are not supported on {dialect}')
+    if analyze:
+        db.session.execute(text('ANALYZE'))
+    table_rows = _table_rows(dialect)
+
+    results = []
+    for name, statement in _queries(dialect, *_samples()).items():
+        explained = db.session.execute(_Explain(statement)).all()
+        if dialect == 'postgresql':
+            plan = explained[0][0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            scanned = _postgres_scans(plan[0]['Plan'])
+        else:
+            scanned = _sqlite_scans(explained)
+        check = PlanCheck(name)
+        for table in scanned:
+            rows = table_rows.get(table)
+            if rows is not None and rows > threshold and (table, rows) not in check.scans:
+                check.scans.append((table, rows))
+        results.append(check)
+    db.session.rollback()
+    return results
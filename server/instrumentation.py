@@ -0,0 +1,134 @@
+"""
+Per-request performance instrumentation.
+
+Records wall time, database time and query count for every request, adds a
+Server-Timing header, logs slow requests and slow statements (never their
+parameters), and aggregates per-endpoint histograms that the admin metrics
+endpoint renders in Prometheus text format. Figures are per worker process.
+"""
+import logging
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Per-endpoint histograms, keyed by metric name."""
+
+    METRICS = {
+        'skillforge_request_duration_seconds': ('Request wall time by endpoint.', DURATION_BUCKETS),
+        'skillforge_request_db_seconds': ('Time spent in SQL per request by endpoint.', DURATION_BUCKETS),
+        'skillforge_request_queries': ('SQL statements executed per request by endpoint.', QUERY_COUNT_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in self.METRICS}
+
+    def observe(self, name, endpoint, value):
+        with self._lock:
+            histogram = self._histograms[name].get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[name][endpoint] = Histogram(self.METRICS[name][1])
+            histogram.observe(value)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (help_text, _) in self.METRICS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for endpoint, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.sum}')
+                    lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+        return lines
+
+
+def _register_sql_listeners(engine, slow_query_seconds):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        if has_request_context() and 'perf' in g:
+            g.perf['db_time'] += elapsed
+            g.perf['queries'] += 1
+        if elapsed >= slow_query_seconds:
+            logger.warning(
+                'Slow query (%.1f ms): %s [parameters redacted]',
+                elapsed * 1000, ' '.join(statement.split())
+            )
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('query_start_time'):
+            connection.info['query_start_time'].pop()
+
+
+def init_app(app, db):
+    """Registers the request hooks and SQL listeners for app."""
+    if not app.config['INSTRUMENTATION_ENABLED']:
+        return
+
+    registry = app.extensions['metrics'] = MetricsRegistry()
+    slow_request_seconds = app.config['SLOW_REQUEST_MS'] / 1000
+    with app.app_context():
+        _register_sql_listeners(db.engine, app.config['SLOW_QUERY_MS'] / 1000)
+
+    @app.before_request
+    def start_timer():
+        g.perf = {'start': time.perf_counter(), 'db_time': 0.0, 'queries': 0}
+
+    @app.after_request
+    def record_timing(response):
+        perf = g.pop('perf', None)
+        if perf is None:
+            return response
+
+        wall = time.perf_counter() - perf['start']
+        endpoint = request.endpoint or 'unmatched'
+        registry.observe('skillforge_request_duration_seconds', endpoint, wall)
+        registry.observe('skillforge_request_db_seconds', endpoint, perf['db_time'])
+        registry.observe('skillforge_request_queries', endpoint, perf['queries'])
+
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={wall * 1000:.1f}, db;dur={perf["db_time"] * 1000:.1f};desc="{perf["queries"]} queries"'
+        )
+        if wall >= slow_request_seconds:
+            logger.warning(
+                'Slow request (%.1f ms, %d queries, %.1f ms in SQL): %s %s',
+                wall * 1000, perf['queries'], perf['db_time'] * 1000, request.method, request.path
+            )
+        return response
@@ -1,15 +1,21 @@
 import typer
-from .app import create_app
-from .models import db, User, Journey, Step
-
-app = create_app()
+from datetime import datetime
+from functools import lru_cache
 
 cli = typer.Typer(help="SkillForge CLI: A tool for managing the application's data.")
 
+@lru_cache(maxsize=None)
+def get_app():
+    """Builds the Flask app on first use, so `--help` does not pay for it."""
+    from .app import create_app
+    return create_app()
+
 @cli.command()
 def init_db():
     """Initializes the database by creating all tables."""
-    with app.app_context():
+    from .models import db
+
+    with get_app().app_context():
         db.create_all()
         typer.secho('Database initialized successfully!', fg=typer.colors.GREEN)
 
@@ -19,13 +25,180 @@ def create_user(
     password: str = typer.Option(..., prompt=True, hide_input=True, help="Password for the new user.")
 ):
     """Creates a new user in the database."""
-    with app.app_context():
+    from .models import db, User
+
+    with get_app().app_context():
       
         user = User(username=username, password=password)
         db.session.add(user)
         db.session.commit()
         typer.secho(f'User "{username}" created successfully!', fg=typer.colors.GREEN)
 
+@cli.command()
+def sync_step_counters(
+    check: bool = typer.Option(False, "--check", help="Only verify the counters, do not fix them.")
+):
+    """Recomputes the denormalized step counters on every journey."""
+    from sqlalchemy import func, or_, select
+    from .models import db, Journey, Step
+
+    with get_app().app_context():
+        actual_total = select(func.count(Step.id)).where(
+            Step.journey_id == Journey.id
+        ).scalar_subquery()
+        actual_completed = select(func.count(Step.id)).where(
+            Step.journey_id == Journey.id,
+            Step.is_complete.is_(True)
+        ).scalar_subquery()
+        stale = db.session.query(Journey).filter(or_(
+            Journey.steps_total != actual_total,
+            Journey.steps_completed != actual_completed
+        ))
+
+        if check:
+            count = stale.count()
+            if count:
+                typer.secho(f'{count} journeys have stale step counters.', fg=typer.colors.RED)
+                raise typer.Exit(code=1)
+            typer.secho('All step counters are up to date.', fg=typer.colors.GREEN)
+            return
+
+        # The version feeds the journey ETags, so cached copies of the old counts are invalidated
+        fixed = stale.update({
+            Journey.steps_total: actual_total,
+            Journey.steps_completed: actual_completed,
+            Journey.version: Journey.version + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        typer.secho(f'Recomputed step counters for {fixed} journeys.', fg=typer.colors.GREEN)
+
+@cli.command()
+def prune_blocklist(
+    batch_size: int = typer.Option(1000, help="Number of rows to delete per transaction.")
+):
+    """Deletes blocklisted tokens that have already expired, in batches."""
+    from .models import db, TokenBlocklist
+
+    with get_app().app_context():
+        now = datetime.utcnow()
+        pruned = 0
+        while True:
+            ids = [row_id for (row_id,) in db.session.query(TokenBlocklist.id).filter(
+                TokenBlocklist.expires_at <= now
+            ).limit(batch_size)]
+            if not ids:
+                break
+            db.session.query(TokenBlocklist).filter(
+                TokenBlocklist.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            pruned += len(ids)
+        typer.secho(f'Pruned {pruned} expired blocklist entries.', fg=typer.colors.GREEN)
+
+@cli.command()
+def purge_deleted_journeys(
+    batch_size: int = typer.Option(5000, help="Number of steps to delete per transaction.")
+):
+    """Permanently removes soft-deleted journeys, deleting their steps in batches."""
+    from sqlalchemy import delete, select
+    from .models import db, Journey, Step
+    from .queries import next_purge
+
+    with get_app().app_context():
+        journeys = steps = 0
+        while True:
+            journey_id = db.session.execute(next_purge()).scalar()
+            if journey_id is None:
+                break
+            # Short transactions keep lock times and WAL bursts small, however many steps the journey has
+            while True:
+                deleted = db.session.execute(delete(Step).where(Step.id.in_(
+                    select(Step.id).where(Step.journey_id == journey_id).limit(batch_size)
+                ))).rowcount
+                db.session.commit()
+                steps += deleted
+                if deleted < batch_size:
+                    break
+            db.session.execute(delete(Journey).where(Journey.id == journey_id))
+            db.session.commit()
+            journeys += 1
+        typer.secho(f'Purged {journeys} deleted journeys and {steps} steps.', fg=typer.colors.GREEN)
+
+@cli.command()
+def import_journeys(
+    path: str = typer.Argument(..., help="NDJSON file to import, or - for stdin."),
+    username: str = typer.Option(..., "--user", help="Username that will own the imported journeys.")
+):
+    """Bulk-imports journeys and steps from an NDJSON file."""
+    import sys
+    from .models import User
+    from .importer import ImportValidationError, import_ndjson
+
+    with get_app().app_context():
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            typer.secho(f'User "{username}" does not exist.', fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+
+        source = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            result = import_ndjson(source, user.id)
+        except ImportValidationError as exc:
+            typer.secho(f'Import rejected: {exc.error_count} invalid lines.', fg=typer.colors.RED)
+            for error in exc.errors:
+                typer.echo(f'  line {error["line"]}: {error["msg"]}')
+            raise typer.Exit(code=1)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        typer.secho(
+            f'Imported {result.journeys} journeys and {result.steps} steps in {result.seconds:.2f}s '
+            f'({result.rows_per_second:,.0f} rows/sec).',
+            fg=typer.colors.GREEN
+        )
+
+@cli.command()
+def generate_import_fixture(
+    path: str = typer.Argument(..., help="File to write the NDJSON fixture to."),
+    journeys: int = typer.Option(1000, help="Number of journeys."),
+    steps_per_journey: int = typer.Option(1000, help="Number of steps in each journey.")
+):
+    """Writes a synthetic NDJSON catalog (1M steps by default) for import benchmarks."""
+    from .importer import fixture_lines
+
+    with open(path, 'w', encoding='utf-8') as output:
+        for line in fixture_lines(journeys, steps_per_journey):
+            output.write(line + '\n')
+    typer.secho(f'Wrote {journeys * (steps_per_journey + 1)} records to {path}.', fg=typer.colors.GREEN)
+
+@cli.command()
+def explain_queries(
+    threshold: int = typer.Option(1000, help="Report full scans of tables with more rows than this."),
+    analyze: bool = typer.Option(True, help="Refresh planner statistics before explaining.")
+):
+    """Runs EXPLAIN on the app's hot queries and fails if any falls back to a full table scan."""
+    from .index_advisor import check_plans
+
+    with get_app().app_context():
+        try:
+            checks = check_plans(threshold, analyze=analyze)
+        except (LookupError, NotImplementedError) as exc:
+            typer.secho(str(exc), fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+
+        for check in checks:
+            if check.ok:
+                typer.echo(f'  ok    {check.name}')
+            else:
+                scans = ', '.join(f'{table} ({rows:,} rows)' for table, rows in check.scans)
+                typer.secho(f'  SCAN  {check.name}: {scans}', fg=typer.colors.RED)
+
+        failed = sum(not check.ok for check in checks)
+        if failed:
+            typer.secho(f'{failed} of {len(checks)} queries scan a table above {threshold} rows.', fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+        typer.secho(f'All {len(checks)} queries use an index.', fg=typer.colors.GREEN)
+
 
 
 
@@ -1,12 +1,14 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
-
+from ..hashing import PasswordHasher
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
+password_hasher = PasswordHasher(bcrypt)
 
 
 from .user import User
 from .journey import Journey
 from .step import Step
-from .user import TokenBlocklist
\ No newline at end of file
+from .user import TokenBlocklist
+from .stats import UserDailyStats
\ No newline at end of file
@@ -1,22 +1,51 @@
 from . import db
+from sqlalchemy import and_
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 
 class Journey(db.Model):
     """
     Journey model for storing learning journeys.
     """
     __tablename__ = 'journeys'
+    __table_args__ = (
+        # Serves keyset pagination on (created_at, id) within a user
+        db.Index('ix_journeys_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # Only soft-deleted journeys are indexed, which is all the purge looks for
+        db.Index('ix_journeys_deleted_at', 'deleted_at',
+                 postgresql_where=db.text('deleted_at IS NOT NULL'),
+                 sqlite_where=db.text('deleted_at IS NOT NULL')),
+        # SQLite would otherwise reuse the highest id after a delete, and ids are part of the ETags
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
-    
+    # Set in Python so SQLite stores microseconds too; its CURRENT_TIMESTAMP default has
+    # whole seconds in a format that does not compare with bound cursor values
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                           server_default=func.now())
+
+    # Denormalized step counters, kept in sync by the step controller
+    steps_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    steps_completed = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Bumped on every change to the journey or its steps; drives the ETags on reads
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # Set by a soft delete; the journey is hidden until purge-deleted-journeys removes it
+    deleted_at = db.Column(db.DateTime(timezone=True), nullable=True)
    
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     user = relationship('User', back_populates='journeys')
-    steps = relationship('Step', back_populates='journey', cascade="all, delete-orphan", lazy='dynamic')
+    # The database deletes the steps (ON DELETE CASCADE), so the ORM never loads them to delete
+    steps = relationship('Step', back_populates='journey', cascade="all, delete-orphan", lazy='dynamic',
+                         passive_deletes=True)
+
+    @classmethod
+    def owned_by(cls, user_id):
+        """Filter for the journeys `user_id` can see: their own, minus soft-deleted ones."""
+        return and_(cls.user_id == user_id, cls.deleted_at.is_(None))
 
     def __repr__(self):
         return f'<Journey {self.title}>'
\ No newline at end of file
@@ -0,0 +1,33 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+from . import db
+
+class UserDailyStats(db.Model):
+    """
+    Daily rollup of completed steps per user, kept up to date incrementally
+    by the step controller so stats never have to scan the steps table.
+    """
+    __tablename__ = 'user_daily_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    steps_completed = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def record_completions(cls, user_id, day_deltas):
+        """Applies per-day completion deltas to the user's daily rollup in the current transaction."""
+        rows = [
+            {'user_id': user_id, 'day': day, 'steps_completed': delta}
+            for day, delta in day_deltas.items() if delta
+        ]
+        if not rows:
+            return
+        dialect_insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+        statement = dialect_insert(cls).values(rows)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['user_id', 'day'],
+            set_={'steps_completed': cls.steps_completed + statement.excluded.steps_completed}
+        ))
+
+    def __repr__(self):
+        return f'<UserDailyStats {self.user_id} {self.day}>'
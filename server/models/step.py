@@ -1,21 +1,36 @@
 from . import db
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
+
+# Spacing between neighbouring step positions after an append or a rebalance
+POSITION_GAP = 1024.0
 
 class Step(db.Model):
     """
     Step model for storing individual steps or tasks within a journey.
     """
     __tablename__ = 'steps'
+    __table_args__ = (
+        # Serves ordered keyset pagination on (position, id) within a journey
+        db.Index('ix_steps_journey_id_position_id', 'journey_id', 'position', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=True)
     is_complete = db.Column(db.Boolean, default=False, nullable=False)
-    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    # Set in Python for the same reason as Journey.created_at
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                           server_default=func.now())
+    # Set when the step is marked complete, cleared when it is reopened
+    completed_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Sort key within the journey. Moves take the midpoint of the new neighbours,
+    # so a reorder rewrites one row; positions are respaced when a gap runs out
+    position = db.Column(db.Float, nullable=False, default=0, server_default='0')
 
 
-    journey_id = db.Column(db.Integer, db.ForeignKey('journeys.id'), nullable=False)
+    journey_id = db.Column(db.Integer, db.ForeignKey('journeys.id', ondelete='CASCADE'), nullable=False)
     journey = relationship('Journey', back_populates='steps')
 
     def __repr__(self):
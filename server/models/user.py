@@ -1,4 +1,4 @@
-from . import db, bcrypt
+from . import db, password_hasher
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -12,7 +12,13 @@ class User(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     
-    journeys = relationship('Journey', back_populates='user', cascade="all, delete-orphan")
+    journeys = relationship('Journey', back_populates='user', cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Serve the case-insensitive login lookup and keep logins unique regardless of case
+        db.Index('ix_users_lower_username', func.lower(username), unique=True),
+        db.Index('ix_users_lower_email', func.lower(email), unique=True),
+    )
 
     @property
     def password(self):
@@ -21,11 +27,15 @@ class User(db.Model):
     @password.setter
     def password(self, password):
         """Hashes the password and stores it in password_hash."""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
 
     def verify_password(self, password):
         """Checks if the provided password matches the stored hash."""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Checks if the stored hash was made with an outdated bcrypt cost."""
+        return password_hasher.needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -34,4 +44,6 @@ class TokenBlocklist(db.Model):
     __tablename__ = 'token_blocklist'
     id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(36), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # When the revoked token would have expired anyway; rows past this are safe to prune
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
\ No newline at end of file
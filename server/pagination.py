@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import DateTime, tuple_
+
+from .async_db import fetch_all
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(sort_value, row_id):
+    """Encodes the (sort value, id) of the last row on a page as an opaque cursor."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor, sort_column=None):
+    """
+    Decodes a cursor produced by encode_cursor back into (sort value, id),
+    checking the value's type against `sort_column` when given.
+    """
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+        elif not isinstance(sort_value, (int, float)) or isinstance(sort_value, bool):
+            raise TypeError('cursor sort value must be a timestamp or a number')
+        row_id = int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor('Invalid pagination cursor') from exc
+    if sort_column is not None and isinstance(sort_value, datetime) != isinstance(sort_column.type, DateTime):
+        # A cursor from a differently ordered listing
+        raise InvalidCursor('Invalid pagination cursor')
+    return sort_value, row_id
+
+
+def get_page_size():
+    """Reads ?limit= from the request, clamped to the configured maximum."""
+    limit = request.args.get('limit', type=int) or current_app.config['DEFAULT_PAGE_SIZE']
+    return max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+
+
+def keyset_page(statement, sort_column, id_column, limit, after=None):
+    """`statement` ordered by (sort_column, id) and limited, seeking past `after` = (sort value, id)."""
+    if after is not None:
+        statement = statement.where(tuple_(sort_column, id_column) > after)
+    return statement.order_by(sort_column, id_column).limit(limit)
+
+
+def keyset_paginate(statement, sort_column, id_column):
+    """
+    Returns one page of the `statement` select ordered by (sort_column, id) and
+    the cursor for the next page, or None on the last page. Seeks past the
+    cursor instead of using OFFSET, so every page costs the same regardless of
+    its depth.
+    """
+    limit = get_page_size()
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor, sort_column) if cursor else None
+
+    rows = fetch_all(keyset_page(statement, sort_column, id_column, limit + 1, after))
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(getattr(rows[-1], sort_column.key), rows[-1].id)
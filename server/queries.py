@@ -0,0 +1,132 @@
+"""
+Statement builders for the app's hot queries.
+
+The controllers, the blocklist and the CLI build these statements here, and
+the index advisor EXPLAINs the same builders, so the plans it checks are the
+plans the app actually runs.
+"""
+from sqlalchemy import case, delete, func, literal, select, update
+
+from .models import Journey, Step, TokenBlocklist, User, UserDailyStats
+from .serializers import JOURNEY_COLUMNS, STEP_COLUMNS
+
+
+def journeys_stamp(user_id):
+    """Count, version sum and highest id of the user's journeys; any write changes one of them."""
+    return select(
+        func.count(Journey.id),
+        func.coalesce(func.sum(Journey.version), 0),
+        func.coalesce(func.max(Journey.id), 0)
+    ).where(Journey.owned_by(user_id))
+
+
+def journeys_of(user_id):
+    """The user's journeys, for keyset_paginate on (created_at, id)."""
+    return select(*JOURNEY_COLUMNS).where(Journey.owned_by(user_id))
+
+
+def owned_journey(journey_id, user_id):
+    return select(*JOURNEY_COLUMNS).where(Journey.id == journey_id, Journey.owned_by(user_id))
+
+
+def steps_of(journey_id):
+    """A journey's steps, for keyset_paginate on (position, id)."""
+    return select(*STEP_COLUMNS).where(Step.journey_id == journey_id)
+
+
+def owned_step(step_id, user_id):
+    """A step with its journey's version, if the journey is the user's."""
+    return select(
+        Step.id, Step.title, Step.description, Step.is_complete, Journey.version
+    ).join(Journey).where(
+        Step.id == step_id,
+        Journey.owned_by(user_id)
+    )
+
+
+def _step_is_owned(user_id):
+    return select(Journey.id).where(Journey.id == Step.journey_id, Journey.owned_by(user_id)).exists()
+
+
+def locked_step(step_id, user_id):
+    """
+    The step's current row, locked and filtered to the user's journeys, for use
+    in the FROM clause of a single UPDATE. Its columns hold the values from
+    before the update, and the row lock makes concurrent updates to the same
+    step wait and then see each other's writes.
+    """
+    return select(
+        Step.id, Step.journey_id, Step.is_complete, Step.completed_at
+    ).join(Journey).where(
+        Step.id == step_id,
+        Journey.owned_by(user_id)
+    ).with_for_update(of=Step).subquery('old_step')
+
+
+def owned_step_update(step_id, user_id, values):
+    """UPDATE ... FROM the locked step, returning its new state and the old completion fields."""
+    old = locked_step(step_id, user_id)
+    return update(Step).where(Step.id == old.c.id).values(values).returning(
+        Step.journey_id, Step.is_complete, Step.completed_at,
+        old.c.is_complete.label('old_is_complete'), old.c.completed_at.label('old_completed_at')
+    ).execution_options(synchronize_session=False)
+
+
+def owned_step_state(step_id, user_id):
+    """
+    A no-op UPDATE of the user's step returning its completion fields. SQLite
+    cannot return FROM-clause columns, so it reads the old state this way; as
+    a write it takes the database lock first.
+    """
+    return update(Step).where(Step.id == step_id, _step_is_owned(user_id)).values(
+        completed_at=Step.completed_at
+    ).returning(Step.is_complete, Step.completed_at).execution_options(synchronize_session=False)
+
+
+def step_update_after(step_id, values, before):
+    """UPDATE by id returning the same row shape as owned_step_update, with the old state from `before`."""
+    return update(Step).where(Step.id == step_id).values(values).returning(
+        Step.journey_id, Step.is_complete, Step.completed_at,
+        literal(before.is_complete).label('old_is_complete'),
+        literal(before.completed_at, Step.completed_at.type).label('old_completed_at')
+    ).execution_options(synchronize_session=False)
+
+
+def owned_step_delete(step_id, user_id):
+    """DELETE of the user's step, returning what the journey counters need."""
+    return delete(Step).where(Step.id == step_id, _step_is_owned(user_id)).returning(
+        Step.journey_id, Step.is_complete
+    ).execution_options(synchronize_session=False)
+
+
+def stats_journeys(user_id):
+    return select(
+        Journey.id, Journey.title, Journey.steps_total, Journey.steps_completed
+    ).where(Journey.owned_by(user_id)).order_by(Journey.created_at, Journey.id)
+
+
+def daily_rollup(user_id):
+    """The user's active days, oldest first."""
+    return select(UserDailyStats.day, UserDailyStats.steps_completed).where(
+        UserDailyStats.user_id == user_id,
+        UserDailyStats.steps_completed > 0
+    ).order_by(UserDailyStats.day)
+
+
+def login_candidates(login_identifier):
+    """Users whose username or email matches case-insensitively, exact-case matches first."""
+    identifier = login_identifier.lower()
+    return select(User).where(
+        (func.lower(User.username) == identifier) | (func.lower(User.email) == identifier)
+    ).order_by(
+        case(((User.username == login_identifier) | (User.email == login_identifier), 0), else_=1)
+    )
+
+
+def revoked_token(jti):
+    return select(TokenBlocklist.id).where(TokenBlocklist.jti == jti)
+
+
+def next_purge():
+    """The soft-deleted journey that has waited longest for purge-deleted-journeys."""
+    return select(Journey.id).where(Journey.deleted_at.isnot(None)).order_by(Journey.deleted_at).limit(1)
@@ -0,0 +1,172 @@
+"""
+Token-bucket rate limiting per blueprint.
+
+Each blueprint listed in RATE_LIMITS gets a bucket per client holding up to
+`count` tokens that refills at count/period. Clients are identified by their
+JWT identity when they send a valid token, and by IP address otherwise, so
+unauthenticated endpoints like login and register are limited per IP. A
+request that finds its bucket empty gets a 429 with Retry-After.
+
+Buckets live in a per-process backend by default. The 'redis' backend shares
+them across workers and hosts, and only needs a client with redis-py's
+register_script API.
+"""
+import logging
+import math
+import threading
+import time
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+# Verified identities of recently seen tokens, so most requests skip a second JWT decode
+IDENTITY_CACHE_SIZE = 10000
+
+
+def parse_limit(limit):
+    """Parses '<count>/<period>' (e.g. '10/minute') into (capacity, tokens per second)."""
+    try:
+        count, period = limit.split('/')
+        count, seconds = int(count), PERIODS[period.strip()]
+    except (AttributeError, ValueError, KeyError) as exc:
+        raise ValueError(f'Invalid rate limit {limit!r}, expected e.g. "10/minute"') from exc
+    if count <= 0:
+        raise ValueError(f'Invalid rate limit {limit!r}, the count must be positive')
+    return count, count / seconds
+
+
+class RateLimitBackend:
+    """Interface for bucket storage."""
+
+    def consume(self, key, capacity, rate):
+        """
+        Takes one token from the bucket at key, refilling it first. Returns the
+        tokens left after the take, or a negative shortfall when it was refused.
+        """
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process buckets, bounded by an LRU."""
+
+    def __init__(self, maxsize, clock=time.monotonic):
+        self.buckets = TTLCache(maxsize)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self.buckets.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            left = tokens - 1
+            if left >= 0:
+                tokens = left
+            # An untouched bucket is full again after this long, so it can be forgotten
+            self.buckets.set(key, (tokens, now), (capacity - tokens) / rate + 1)
+        return left
+
+
+class RedisBackend(RateLimitBackend):
+    """Shared buckets, updated atomically by a Lua script in one round trip."""
+
+    SCRIPT = """
+        local capacity = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local now = tonumber(ARGV[3])
+        local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+        local tokens = tonumber(bucket[1]) or capacity
+        local updated = tonumber(bucket[2]) or now
+        tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+        local left = tokens - 1
+        if left >= 0 then
+            tokens = left
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+        redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+        return tostring(left)
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._script = client.register_script(self.SCRIPT)
+
+    @classmethod
+    def from_url(cls, url):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND = 'redis' requires the redis package") from exc
+        return cls(redis.Redis.from_url(url))
+
+    def consume(self, key, capacity, rate):
+        # Wall-clock time, since the buckets are shared between hosts
+        return float(self._script(keys=[key], args=[capacity, rate, time.time()]))
+
+
+class RateLimiter:
+
+    def init_app(self, app):
+        backend_name = app.config['RATE_LIMIT_BACKEND']
+        if backend_name == 'redis':
+            backend = RedisBackend.from_url(app.config['RATE_LIMIT_REDIS_URL'])
+        elif backend_name == 'memory':
+            backend = MemoryBackend(app.config['RATE_LIMIT_SIZE'])
+        else:
+            raise ValueError(f'Unknown RATE_LIMIT_BACKEND: {backend_name}')
+        app.extensions['rate_limiter'] = {
+            'backend': backend,
+            'identities': TTLCache(IDENTITY_CACHE_SIZE),
+            'limits': {name: parse_limit(limit) for name, limit in app.config['RATE_LIMITS'].items() if limit}
+        }
+        app.before_request(self.check)
+
+    @staticmethod
+    def _client_key(identities):
+        token = request.headers.get('Authorization')
+        identity = identities.get(token) if token else None
+        if token and identity is None:
+            try:
+                verify_jwt_in_request(optional=True)
+                identity = get_jwt_identity()
+            except (JWTExtendedException, PyJWTError):
+                identity = None
+            if identity is not None:
+                # Tokens without an expiry are re-verified every few minutes
+                expires_at = get_jwt().get('exp') or time.time() + 300
+                identities.set(token, identity, expires_at - time.time())
+        # Invalid and expired tokens are limited by IP; the endpoint itself rejects them
+        return f'user:{identity}' if identity is not None else f'ip:{request.remote_addr}'
+
+    def check(self):
+        if not current_app.config['RATE_LIMIT_ENABLED'] or request.method == 'OPTIONS':
+            return None
+        state = current_app.extensions['rate_limiter']
+        limit = state['limits'].get(request.blueprint)
+        if limit is None:
+            return None
+
+        capacity, rate = limit
+        key = f'ratelimit:{request.blueprint}:{self._client_key(state["identities"])}'
+        try:
+            left = state['backend'].consume(key, capacity, rate)
+        except Exception:
+            # A broken shared store should not take the API down with it
+            logger.warning('Rate limit backend failed, allowing request', exc_info=True)
+            return None
+        if left >= 0:
+            return None
+
+        response = jsonify({"msg": "Too many requests, please try again later"})
+        response.headers['Retry-After'] = str(max(1, math.ceil(-left / rate)))
+        return response, 429
+
+
+rate_limiter = RateLimiter()
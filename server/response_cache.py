@@ -0,0 +1,147 @@
+import json
+import threading
+
+from flask import current_app
+
+from .cache import TTLCache
+
+# Response headers that are part of a cached body and must be replayed with it
+CACHED_HEADERS = ('X-Next-Cursor',)
+
+
+class CacheBackend:
+    """Interface for response cache storage; values are bytes."""
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU backend."""
+
+    def __init__(self, maxsize):
+        self.cache = TTLCache(maxsize)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, ttl):
+        self.cache.set(key, value, ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.cache.delete(key)
+
+
+class RedisBackend(CacheBackend):
+    """Shared backend over any client with the redis-py get/set/delete API."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND = 'redis' requires the redis package") from exc
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl):
+        self.client.set(key, value, ex=ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*keys)
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class ResponseCache:
+    """
+    Read-through cache of rendered JSON responses.
+
+    Callers key entries by the same user/version stamp as the response ETag,
+    and every write path bumps that version, so a write makes the old entry
+    unreachable on every worker at once. Superseded entries age out through
+    the LRU and RESPONSE_CACHE_TTL. Concurrent misses on one key within a
+    worker are coalesced, so only one of them renders the response.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def init_app(self, app):
+        backend_name = app.config['RESPONSE_CACHE_BACKEND']
+        if backend_name == 'redis':
+            backend = RedisBackend.from_url(app.config['RESPONSE_CACHE_REDIS_URL'])
+        elif backend_name == 'memory':
+            backend = MemoryBackend(app.config['RESPONSE_CACHE_SIZE'])
+        else:
+            raise ValueError(f'Unknown RESPONSE_CACHE_BACKEND: {backend_name}')
+        app.extensions['response_cache'] = backend
+
+    @property
+    def backend(self):
+        return current_app.extensions['response_cache']
+
+    def get_or_render(self, key, render):
+        """Returns the cached response for key, calling render() to build it on a miss."""
+        if not current_app.config['RESPONSE_CACHE_ENABLED']:
+            return render()
+
+        cached = self.backend.get(key)
+        if cached is not None:
+            return self._load(cached)
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+
+        if not leader:
+            flight.done.wait(timeout=current_app.config['RESPONSE_CACHE_WAIT'])
+            cached = self.backend.get(key)
+            # Render it ourselves if the leader failed or the entry was already evicted
+            return self._load(cached) if cached is not None else render()
+
+        try:
+            response = render()
+            if response.status_code == 200:
+                self.backend.set(key, self._dump(response), current_app.config['RESPONSE_CACHE_TTL'])
+            return response
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    @staticmethod
+    def _dump(response):
+        return json.dumps({
+            'body': response.get_data(as_text=True),
+            'headers': {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        }).encode('utf-8')
+
+    @staticmethod
+    def _load(cached):
+        entry = json.loads(cached)
+        return current_app.response_class(
+            entry['body'], mimetype='application/json', headers=entry['headers']
+        )
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,166 @@
+"""
+Full-text search over journey and step titles and descriptions.
+
+On Postgres both tables carry a generated `search_vector` tsvector column with
+a GIN index, so a search is an index lookup instead of an ILIKE scan over the
+description text. SQLite has no tsvector, so there each table gets an FTS5
+index kept in sync by triggers. The search columns and tables exist only in
+the database (created by the migration, or by the hooks below on create_all),
+not on the models.
+"""
+import base64
+import html
+import json
+
+from sqlalchemy import DDL, event, func, literal_column, select, text, union_all
+
+from .models import db, Journey, Step
+from .async_db import fetch_all
+
+TEXT_SEARCH_CONFIG = 'english'
+# The database delimits matches with control characters rather than <mark>, so the
+# snippet can be HTML-escaped before the tags go in (see render_headline)
+MARK_START, MARK_END = '\x02', '\x03'
+HEADLINE_OPTIONS = f'StartSel={MARK_START}, StopSel={MARK_END}, MaxFragments=2, MaxWords=20, MinWords=5'
+# Titles outweigh descriptions in the ranking
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
+
+class InvalidSearchCursor(ValueError):
+    """Raised when a search cursor cannot be decoded."""
+
+
+def _postgres_ddl(table):
+    return [
+        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED",
+        f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)",
+    ]
+
+
+def sqlite_fts_triggers(table):
+    """
+    The triggers that keep `table`'s FTS5 index in sync on SQLite, for
+    create_all. The migrations hold literal copies of this SQL; changing it
+    needs a new migration that drops and recreates the triggers.
+    """
+    fts = f'{table}_fts'
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF title, description ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+        f"INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    ]
+
+
+def _sqlite_ddl(table):
+    return [
+        f"CREATE VIRTUAL TABLE {table}_fts USING fts5(title, description, content='{table}', content_rowid='id')",
+        *sqlite_fts_triggers(table),
+    ]
+
+
+# Keep db.create_all() (init-db, local SQLite setups) in step with the migration
+for _table in (Journey.__table__, Step.__table__):
+    for _statement in _postgres_ddl(_table.name):
+        event.listen(_table, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+    for _statement in _sqlite_ddl(_table.name):
+        event.listen(_table, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+    event.listen(_table, 'before_drop', DDL(f'DROP TABLE IF EXISTS {_table.name}_fts').execute_if(dialect='sqlite'))
+
+
+def encode_search_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps([offset]).encode('utf-8')).decode('ascii')
+
+
+def decode_search_cursor(cursor):
+    try:
+        offset, = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        offset = int(offset)
+    except (ValueError, TypeError) as exc:
+        raise InvalidSearchCursor('Invalid search cursor') from exc
+    if offset < 0:
+        raise InvalidSearchCursor('Invalid search cursor')
+    return offset
+
+
+def _postgres_statement(user_id, query_text, limit, offset):
+    query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query_text)
+    journey_vector = literal_column('journeys.search_vector')
+    step_vector = literal_column('steps.search_vector')
+
+    journeys = select(
+        literal_column("'journey'").label('kind'), Journey.id, Journey.id.label('journey_id'),
+        Journey.title, Journey.description, func.ts_rank(journey_vector, query).label('rank')
+    ).where(Journey.owned_by(user_id), journey_vector.op('@@')(query))
+    steps = select(
+        literal_column("'step'"), Step.id, Step.journey_id,
+        Step.title, Step.description, func.ts_rank(step_vector, query)
+    ).join(Journey, Journey.id == Step.journey_id).where(
+        Journey.owned_by(user_id), step_vector.op('@@')(query)
+    )
+    hits = union_all(journeys, steps).subquery('hits')
+    page = select(hits).order_by(hits.c.rank.desc(), hits.c.kind, hits.c.id).limit(limit).offset(offset).subquery('page')
+
+    # ts_headline re-parses the text, so it only runs on the rows of this page
+    return select(
+        page.c.kind, page.c.id, page.c.journey_id, page.c.title, page.c.rank,
+        func.ts_headline(
+            TEXT_SEARCH_CONFIG, func.concat_ws(' ', page.c.title, page.c.description), query, HEADLINE_OPTIONS
+        ).label('headline')
+    ).order_by(page.c.rank.desc(), page.c.kind, page.c.id)
+
+
+_SQLITE_SEARCH = text("""
+    SELECT 'journey' AS kind, journeys.id AS id, journeys.id AS journey_id, journeys.title AS title,
+           -bm25(journeys_fts, 4.0, 1.0) AS rank,
+           snippet(journeys_fts, -1, :mark_start, :mark_end, '...', 16) AS headline
+    FROM journeys_fts JOIN journeys ON journeys.id = journeys_fts.rowid
+    WHERE journeys_fts MATCH :match AND journeys.user_id = :user_id AND journeys.deleted_at IS NULL
+    UNION ALL
+    SELECT 'step', steps.id, steps.journey_id, steps.title,
+           -bm25(steps_fts, 4.0, 1.0),
+           snippet(steps_fts, -1, :mark_start, :mark_end, '...', 16)
+    FROM steps_fts JOIN steps ON steps.id = steps_fts.rowid
+    JOIN journeys ON journeys.id = steps.journey_id
+    WHERE steps_fts MATCH :match AND journeys.user_id = :user_id AND journeys.deleted_at IS NULL
+    ORDER BY rank DESC, kind, id
+    LIMIT :limit OFFSET :offset
+""")
+
+
+def _fts5_match(query_text):
+    # Quote every term so user input cannot use FTS5 query syntax; terms are ANDed
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in query_text.split())
+
+
+def search(user_id, query_text, limit, offset=0):
+    """
+    Returns up to `limit` journeys and steps owned by `user_id` matching
+    `query_text`, best match first. Each row has kind ('journey' or 'step'),
+    id, journey_id, title, rank and headline, where the headline is a raw
+    snippet with matched terms between MARK_START and MARK_END; pass it
+    through render_headline before showing it as HTML.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        return fetch_all(_SQLITE_SEARCH.bindparams(
+            match=_fts5_match(query_text), user_id=user_id, limit=limit, offset=offset,
+            mark_start=MARK_START, mark_end=MARK_END
+        ))
+    return fetch_all(_postgres_statement(user_id, query_text, limit, offset))
+
+
+def render_headline(headline):
+    """
+    HTML-escapes a raw snippet from search() and wraps its matched terms in
+    <mark> tags. Markup typed into a title or description comes out as text.
+    """
+    if headline is None:
+        return None
+    return html.escape(headline).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
@@ -0,0 +1,105 @@
+"""
+Shared serialization for journey and step payloads.
+
+Read paths select only the columns listed here and get plain row tuples back
+instead of hydrating ORM entities. JSON encoding uses orjson when it is
+installed, with output matching Flask's default provider.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+from .models import Journey, Step
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib provider
+    orjson = None
+
+
+JOURNEY_COLUMNS = (
+    Journey.id, Journey.title, Journey.description, Journey.created_at,
+    Journey.user_id, Journey.steps_total, Journey.steps_completed, Journey.version
+)
+STEP_COLUMNS = (
+    Step.id, Step.title, Step.description, Step.is_complete, Step.created_at, Step.position
+)
+
+
+def progress(steps_total, steps_completed):
+    """Completion percentage computed from the denormalized counters."""
+    if not steps_total:
+        return 0.0
+    return round(100 * steps_completed / steps_total, 1)
+
+
+def journey_summary(row):
+    return {
+        'id': row.id,
+        'title': row.title,
+        'description': row.description,
+        'created_at': row.created_at.isoformat(),
+        'user_id': row.user_id,
+        'steps_count': row.steps_total,
+        'steps_completed': row.steps_completed,
+        'progress': progress(row.steps_total, row.steps_completed)
+    }
+
+
+def journey_detail(row, steps):
+    payload = journey_summary(row)
+    payload['steps'] = [step_summary(step) for step in steps]
+    return payload
+
+
+def step_summary(row):
+    return {
+        'id': row.id,
+        'title': row.title,
+        'description': row.description,
+        'is_complete': row.is_complete,
+        'created_at': row.created_at.isoformat(),
+        'position': row.position
+    }
+
+
+def step_detail(row):
+    return {
+        'id': row.id,
+        'title': row.title,
+        'description': row.description,
+        'is_complete': row.is_complete
+    }
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson. Keys are sorted and values orjson does not
+    handle the same way as Flask (dates, dataclasses) are passed to Flask's
+    default hook, so responses keep the same shape.
+    """
+
+    OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+               | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.OPTIONS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        body = orjson.dumps(obj, default=self.default, option=option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app):
+    """Switches app.json to orjson when it is available."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
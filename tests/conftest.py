@@ -0,0 +1,84 @@
+import os
+import re
+
+import pytest
+
+from server.app import create_app
+from server.config import TestingConfig
+from server.models import Journey, Step, User, db
+
+SERVER_TIMING_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'postgres: runs against TEST_POSTGRES_URL; skipped when it is not set')
+
+
+@pytest.fixture
+def app(request, tmp_path, monkeypatch):
+    """
+    The app on a throwaway SQLite file, or on TEST_POSTGRES_URL when a test
+    parametrizes this fixture indirectly with 'postgres'. That database is a
+    scratch one: its tables are dropped before and after the test.
+    """
+    monkeypatch.delenv('RENDER', raising=False)
+    if getattr(request, 'param', 'sqlite') == 'postgres':
+        url = os.environ.get('TEST_POSTGRES_URL')
+        if not url:
+            pytest.skip('TEST_POSTGRES_URL is not set')
+    else:
+        # A file rather than :memory: so threads each get their own connection
+        url = f"sqlite:///{tmp_path / 'test.db'}"
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', url)
+    app = create_app('testing')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    with app.app_context():
+        user = User(username='alice', email='alice@example.com', password='correct horse')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def auth_headers(client, user):
+    response = client.post('/api/auth/login', json={'login': 'alice', 'password': 'correct horse'})
+    assert response.status_code == 200
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def add_journeys(app, user_id, count, steps_per_journey=0):
+    """Inserts count journeys with their steps directly and returns their ids."""
+    with app.app_context():
+        journeys = [Journey(title=f'Journey {n}', user_id=user_id, steps_total=steps_per_journey)
+                    for n in range(count)]
+        db.session.add_all(journeys)
+        db.session.flush()
+        db.session.add_all(
+            Step(title=f'Step {n}', journey_id=journey.id, position=(n + 1) * 1024.0)
+            for journey in journeys for n in range(steps_per_journey)
+        )
+        db.session.commit()
+        return [journey.id for journey in journeys]
+
+
+def query_count(response):
+    """SQL statements the request ran, as reported in its Server-Timing header."""
+    match = SERVER_TIMING_QUERIES.search(response.headers['Server-Timing'])
+    assert match, response.headers['Server-Timing']
+    return int(match.group(1))
@@ -0,0 +1,32 @@
+def test_register_rejects_a_username_differing_only_in_case(client, user):
+    response = client.post('/api/auth/register', json={
+        'username': 'ALICE', 'email': 'other@example.com', 'password': 'secret'
+    })
+    assert response.status_code == 409
+    assert response.get_json()['field'] == 'username'
+
+
+def test_register_rejects_an_email_differing_only_in_case(client, user):
+    response = client.post('/api/auth/register', json={
+        'username': 'bob', 'email': 'Alice@Example.com', 'password': 'secret'
+    })
+    assert response.status_code == 409
+    assert response.get_json()['field'] == 'email'
+
+
+def test_login_ignores_case(client, user):
+    for login in ('ALICE', 'alice@EXAMPLE.com'):
+        response = client.post('/api/auth/login', json={'login': login, 'password': 'correct horse'})
+        assert response.status_code == 200
+
+
+def test_login_tries_every_user_matching_the_identifier(client, user):
+    # bob's username is alice's email, so the identifier matches both users
+    client.post('/api/auth/register', json={
+        'username': 'alice@example.com', 'email': 'bob@example.com', 'password': 'bobs password'
+    })
+    for password in ('correct horse', 'bobs password'):
+        response = client.post('/api/auth/login', json={'login': 'alice@example.com', 'password': password})
+        assert response.status_code == 200
+    response = client.post('/api/auth/login', json={'login': 'alice@example.com', 'password': 'wrong'})
+    assert response.status_code == 401
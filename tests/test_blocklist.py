@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import decode_token
+
+from server.models import TokenBlocklist, db
+
+
+def test_revocation_written_by_a_skewed_host_reaches_the_filter(app, client, auth_headers):
+    assert client.get('/api/journeys/', headers=auth_headers).status_code == 200
+
+    with app.app_context():
+        token = decode_token(auth_headers['Authorization'].split()[1])
+        # Another worker whose clock runs an hour behind records the logout
+        db.session.add(TokenBlocklist(
+            jti=token['jti'],
+            created_at=datetime.utcnow() - timedelta(hours=1),
+            expires_at=datetime.utcfromtimestamp(token['exp'])
+        ))
+        db.session.commit()
+    app.extensions['blocklist_bloom'].next_refresh = 0.0
+
+    assert client.get('/api/journeys/', headers=auth_headers).status_code == 401
+
+
+def test_logout_revokes_the_token(client, auth_headers):
+    assert client.delete('/api/auth/logout', headers=auth_headers).status_code == 200
+    assert client.get('/api/journeys/', headers=auth_headers).status_code == 401
+
+
+def test_revocation_committed_out_of_id_order_is_loaded_by_the_rebuild(app, client, auth_headers):
+    assert client.get('/api/journeys/', headers=auth_headers).status_code == 200
+    state = app.extensions['blocklist_bloom']
+
+    with app.app_context():
+        token = decode_token(auth_headers['Authorization'].split()[1])
+        expires_at = datetime.utcfromtimestamp(token['exp'])
+        # Other workers' revocations take ids well past the overlap and are synced
+        db.session.add_all(TokenBlocklist(jti=f'other-{n}', expires_at=expires_at) for n in range(200))
+        db.session.commit()
+        state.next_refresh = 0.0
+        assert client.get('/api/journeys/', headers=auth_headers).status_code == 200
+        # ...before this one, whose id was allocated first, commits
+        db.session.add(TokenBlocklist(id=0, jti=token['jti'], expires_at=expires_at))
+        db.session.commit()
+
+    state.next_refresh = 0.0
+    assert client.get('/api/journeys/', headers=auth_headers).status_code == 200
+
+    state.next_refresh = state.next_rebuild = 0.0
+    assert client.get('/api/journeys/', headers=auth_headers).status_code == 401
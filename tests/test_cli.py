@@ -0,0 +1,52 @@
+import pytest
+import typer
+
+from server import main
+from server.index_advisor import check_plans
+from server.models import Journey, db
+
+from .conftest import add_journeys
+
+
+@pytest.fixture
+def cli_app(app, monkeypatch):
+    monkeypatch.setattr(main, 'get_app', lambda: app)
+    return app
+
+
+def test_sync_step_counters_bumps_the_version_of_fixed_journeys(cli_app, user):
+    stale_id, fresh_id = add_journeys(cli_app, user, 2, steps_per_journey=2)
+    with cli_app.app_context():
+        db.session.get(Journey, stale_id).steps_total = 5
+        db.session.commit()
+
+    main.sync_step_counters(check=False)
+
+    with cli_app.app_context():
+        stale, fresh = db.session.get(Journey, stale_id), db.session.get(Journey, fresh_id)
+        assert (stale.steps_total, stale.version) == (2, 2)
+        assert fresh.version == 1
+
+
+def test_explain_queries_checks_the_controller_statements(cli_app, user):
+    add_journeys(cli_app, user, 3, steps_per_journey=3)
+
+    with pytest.raises(typer.Exit) as exit_info:
+        main.explain_queries(threshold=0, analyze=True)
+    # Every table is over a threshold of 0 rows, so at least one plan reports a scan
+    assert exit_info.value.exit_code == 1
+
+    with cli_app.app_context():
+        names = [check.name for check in check_plans(threshold=10 ** 6)]
+    assert 'steps: owned update' in names and 'steps: get' in names
+
+
+def test_explain_queries_reports_an_unsupported_dialect(cli_app, monkeypatch, capsys):
+    def unsupported(threshold, analyze):
+        raise NotImplementedError('Plan checks are not supported on mysql')
+    monkeypatch.setattr('server.index_advisor.check_plans', unsupported)
+
+    with pytest.raises(typer.Exit) as exit_info:
+        main.explain_queries(threshold=1000, analyze=False)
+    assert exit_info.value.exit_code == 1
+    assert 'not supported on mysql' in capsys.readouterr().out
@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from server.models import Journey, Step, UserDailyStats, db
+
+from .conftest import add_journeys
+
+
+# SQLite reads the old state with a locking no-op UPDATE; Postgres runs the
+# single UPDATE ... FROM (SELECT ... FOR UPDATE) that production uses
+@pytest.mark.parametrize('app', ['sqlite', pytest.param('postgres', marks=pytest.mark.postgres)], indirect=True)
+def test_concurrent_toggles_keep_state_and_counters_consistent(app, user, auth_headers):
+    journey_id, = add_journeys(app, user, 1, steps_per_journey=1)
+    threads, toggles_per_thread = 8, 25
+    statuses = []
+    barrier = threading.Barrier(threads)
+
+    def toggle_repeatedly():
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(toggles_per_thread):
+            statuses.append(client.put('/api/steps/1/complete', headers=auth_headers).status_code)
+
+    workers = [threading.Thread(target=toggle_repeatedly) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert statuses == [200] * threads * toggles_per_thread
+    # An even number of toggles leaves the step where it started
+    with app.app_context():
+        step = db.session.get(Step, 1)
+        journey = db.session.get(Journey, journey_id)
+        assert step.is_complete is False
+        assert step.completed_at is None
+        assert (journey.steps_total, journey.steps_completed) == (1, 0)
+        assert journey.version == 1 + threads * toggles_per_thread
+        assert sum(row.steps_completed for row in UserDailyStats.query.filter_by(user_id=user)) == 0
@@ -0,0 +1,40 @@
+import pytest
+
+from .conftest import add_journeys, query_count
+
+
+@pytest.mark.parametrize('path', ['/api/journeys/', '/api/journeys/{journey_id}', '/api/steps/{step_id}'])
+def test_not_modified_runs_at_most_one_query(app, client, user, auth_headers, path):
+    journey_id, = add_journeys(app, user, 1, steps_per_journey=1)
+    url = path.format(journey_id=journey_id, step_id=1)
+
+    etag = client.get(url, headers=auth_headers).headers['ETag']
+    response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert query_count(response) <= 1
+
+
+def test_step_change_invalidates_the_journey_etag(app, client, user, auth_headers):
+    journey_id, = add_journeys(app, user, 1, steps_per_journey=1)
+    url = f'/api/journeys/{journey_id}'
+    etag = client.get(url, headers=auth_headers).headers['ETag']
+
+    client.put('/api/steps/1/complete', headers=auth_headers)
+
+    assert client.get(url, headers={**auth_headers, 'If-None-Match': etag}).status_code == 200
+
+
+def test_delete_then_create_changes_the_listing_etag(client, user, auth_headers):
+    for title in ('A', 'OLD-B'):
+        client.post('/api/journeys/', headers=auth_headers, json={'title': title})
+    listing = client.get('/api/journeys/', headers=auth_headers)
+    old_b = listing.get_json()[-1]['id']
+
+    client.delete(f'/api/journeys/{old_b}', headers=auth_headers)
+    created = client.post('/api/journeys/', headers=auth_headers, json={'title': 'NEW-B'}).get_json()
+    response = client.get('/api/journeys/', headers={**auth_headers, 'If-None-Match': listing.headers['ETag']})
+
+    assert created['id'] != old_b
+    assert response.status_code == 200
+    assert [journey['title'] for journey in response.get_json()] == ['A', 'NEW-B']
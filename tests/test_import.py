@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+
+def ndjson(*records):
+    return '\n'.join(json.dumps(record) for record in records)
+
+
+def test_import_creates_journeys_and_steps(client, auth_headers):
+    body = ndjson(
+        {'type': 'journey', 'id': 1, 'title': 'Rust'},
+        {'type': 'step', 'journey_id': 1, 'title': 'Ownership', 'is_complete': True},
+    )
+    response = client.post('/api/journeys/import', headers=auth_headers, data=body)
+
+    assert response.status_code == 201
+    assert response.get_json()['journeys'] == 1
+    assert response.get_json()['steps'] == 1
+
+
+@pytest.mark.parametrize('journey_id', [1.0, True, '1'])
+def test_step_journey_id_must_be_an_integer(client, auth_headers, journey_id):
+    body = ndjson(
+        {'type': 'journey', 'id': 1, 'title': 'Rust'},
+        {'type': 'step', 'journey_id': journey_id, 'title': 'Ownership'},
+    )
+    response = client.post('/api/journeys/import', headers=auth_headers, data=body)
+
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [{'line': 2, 'msg': 'step journey_id must be an integer'}]
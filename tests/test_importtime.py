@@ -0,0 +1,47 @@
+"""
+Cold-start budgets for the CLI and the WSGI entry point.
+
+Each case imports the module in a fresh interpreter under `-X importtime`,
+checks that the heavy extensions stay deferred until an app is built, and
+keeps the module's cumulative import time within a budget several times
+what it takes locally, so only a real regression trips it.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Module -> (cumulative import budget in seconds, modules it must not import)
+BUDGETS = {
+    'server.main': (0.75, {'flask', 'sqlalchemy', 'flask_sqlalchemy', 'flask_jwt_extended'}),
+    'server.app': (1.5, {'flask_sqlalchemy', 'flask_jwt_extended', 'flask_migrate', 'flask_cors',
+                         'flask_bcrypt', 'alembic'}),
+}
+
+
+def _import_times(module):
+    """Cumulative import time in seconds of every module imported by `import module`."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+@pytest.mark.parametrize('module', sorted(BUDGETS))
+def test_import_stays_within_budget(module):
+    budget, deferred = BUDGETS[module]
+    # Best of three, so a busy machine does not fail the run on its own
+    runs = [_import_times(module) for _ in range(3)]
+
+    assert not deferred & runs[0].keys()
+    assert min(times[module] for times in runs) <= budget
@@ -0,0 +1,27 @@
+from .conftest import add_journeys, query_count
+
+
+def _listing_queries(client, auth_headers, expected):
+    response = client.get('/api/journeys/', headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.get_json()) == expected
+    return query_count(response)
+
+
+def test_listing_statement_count_does_not_grow_with_journeys(app, client, user, auth_headers):
+    # The first authenticated request also loads the blocklist filter
+    _listing_queries(client, auth_headers, 0)
+
+    add_journeys(app, user, 1, steps_per_journey=3)
+    single = _listing_queries(client, auth_headers, 1)
+
+    # The new journeys change the ETag, so this listing is rendered rather than served from cache
+    add_journeys(app, user, 49, steps_per_journey=3)
+    fifty = _listing_queries(client, auth_headers, 50)
+    assert fifty == single
+
+
+def test_listing_reports_step_counts(app, client, user, auth_headers):
+    add_journeys(app, user, 2, steps_per_journey=4)
+    journeys = client.get('/api/journeys/', headers=auth_headers).get_json()
+    assert [journey['steps_count'] for journey in journeys] == [4, 4]
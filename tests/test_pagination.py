@@ -0,0 +1,26 @@
+from .conftest import add_journeys
+
+
+def _exported_journeys(app, response):
+    records = [app.json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return [record for record in records if record['type'] == 'journey']
+
+
+def test_keyset_pages_cover_rows_created_in_the_same_second(app, client, user, auth_headers):
+    ids = add_journeys(app, user, 3)
+
+    first = client.get('/api/journeys/?limit=2', headers=auth_headers)
+    cursor = first.headers['X-Next-Cursor']
+    second = client.get(f'/api/journeys/?limit=2&cursor={cursor}', headers=auth_headers)
+
+    seen = [journey['id'] for journey in first.get_json() + second.get_json()]
+    assert seen == ids
+    assert 'X-Next-Cursor' not in second.headers
+
+
+def test_export_resumes_at_the_cursor_journey(app, client, user, auth_headers):
+    ids = add_journeys(app, user, 3, steps_per_journey=1)
+    journeys = _exported_journeys(app, client.get('/api/journeys/export', headers=auth_headers))
+
+    resumed = client.get(f"/api/journeys/export?cursor={journeys[1]['cursor']}", headers=auth_headers)
+    assert [journey['id'] for journey in _exported_journeys(app, resumed)] == ids[1:]
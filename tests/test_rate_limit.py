@@ -0,0 +1,41 @@
+import pytest
+
+from server.config import TestingConfig
+
+ORIGIN = 'https://skill-forge-self.vercel.app'
+
+
+@pytest.fixture
+def rate_limits(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'RATE_LIMITS', {'auth_bp': '2/minute'})
+    monkeypatch.setattr(TestingConfig, 'PROXY_FIX_X_FOR', 1)
+
+
+@pytest.fixture
+def app(rate_limits, app):
+    return app
+
+
+def login_from(client, address):
+    return client.post('/api/auth/login', json={'login': 'nobody', 'password': 'wrong'},
+                       headers={'X-Forwarded-For': address, 'Origin': ORIGIN})
+
+
+def test_limited_response_exposes_retry_after(client):
+    for _ in range(2):
+        assert login_from(client, '203.0.113.1').status_code == 401
+
+    response = login_from(client, '203.0.113.1')
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert 'Retry-After' in response.headers['Access-Control-Expose-Headers']
+
+
+def test_clients_behind_the_proxy_get_their_own_buckets(client):
+    for _ in range(2):
+        login_from(client, '203.0.113.1')
+
+    assert login_from(client, '203.0.113.1').status_code == 429
+    assert login_from(client, '203.0.113.2').status_code == 401
@@ -0,0 +1,19 @@
+def test_headline_escapes_markup_and_marks_matches(client, auth_headers):
+    client.post('/api/journeys/', headers=auth_headers,
+                json={'title': '<img src=x onerror=alert(1)> Rust basics'})
+
+    response = client.get('/api/search?q=rust', headers=auth_headers)
+
+    assert response.status_code == 200
+    result, = response.get_json()
+    assert result['headline'] == '&lt;img src=x onerror=alert(1)&gt; <mark>Rust</mark> basics'
+    assert result['title'] == '<img src=x onerror=alert(1)> Rust basics'
+
+
+def test_search_only_returns_the_users_content(app, client, auth_headers):
+    client.post('/api/journeys/', headers=auth_headers, json={'title': 'Learn Go'})
+    client.post('/api/auth/register', json={'username': 'bob', 'email': 'bob@example.com', 'password': 'pw'})
+    token = client.post('/api/auth/login', json={'login': 'bob', 'password': 'pw'}).get_json()['access_token']
+
+    response = client.get('/api/search?q=go', headers={'Authorization': f'Bearer {token}'})
+    assert response.get_json() == []
@@ -0,0 +1,62 @@
+from server.models import Journey, Step, db
+
+from .conftest import add_journeys
+
+
+def _steps(app, journey_id):
+    with app.app_context():
+        return {step.id: step.title for step in Step.query.filter_by(journey_id=journey_id)}
+
+
+def test_batch_update_reports_invalid_items_and_applies_the_rest(app, client, user, auth_headers):
+    journey_id, = add_journeys(app, user, 1, steps_per_journey=3)
+    first, second, third = sorted(_steps(app, journey_id))
+
+    response = client.patch('/api/steps:batch', headers=auth_headers, json={'steps': [
+        {'id': first, 'title': None},
+        {'id': second, 'title': 'Renamed', 'is_complete': True},
+        {'id': third, 'description': 7},
+    ]})
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result.get('error') for result in results] == [
+        'Missing title', None, 'Description must be a string'
+    ]
+    assert _steps(app, journey_id) == {first: 'Step 0', second: 'Renamed', third: 'Step 2'}
+    with app.app_context():
+        assert db.session.get(Journey, journey_id).steps_completed == 1
+
+
+def test_batch_update_with_only_invalid_items_is_rejected(app, client, user, auth_headers):
+    journey_id, = add_journeys(app, user, 1, steps_per_journey=1)
+    step_id, = _steps(app, journey_id)
+
+    response = client.patch('/api/steps:batch', headers=auth_headers,
+                            json={'steps': [{'id': step_id, 'title': 'x' * 151}]})
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['error'] == 'Title must be at most 150 characters'
+
+
+def test_batch_items_need_a_boolean_is_complete_and_something_to_update(app, client, user, auth_headers):
+    journey_id, = add_journeys(app, user, 1, steps_per_journey=3)
+    first, second, third = sorted(_steps(app, journey_id))
+
+    response = client.patch('/api/steps:batch', headers=auth_headers, json={'steps': [
+        {'id': first, 'is_complete': 'false'},
+        {'id': second},
+        {'id': third, 'is_complete': True},
+    ]})
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 1
+    assert [result.get('error') for result in response.get_json()['results']] == [
+        'is_complete must be a boolean', 'Nothing to update', None
+    ]
+
+    response = client.post(f'/api/journeys/{journey_id}/steps:batch', headers=auth_headers, json={'steps': [
+        {'title': 'New', 'is_complete': 0},
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['error'] == 'is_complete must be a boolean'
+    with app.app_context():
+        assert db.session.get(Journey, journey_id).steps_completed == 1